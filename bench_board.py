@@ -0,0 +1,243 @@
+"""
+Micro-benchmarks for the Board and BitBoard hot paths.
+
+The boards are positions of a four player game of random moves, replayed
+from a seed: the empty board, the position halfway through the game and one
+nearly at its end, so the same command gives the same positions on every
+machine:
+
+    python bench_board.py
+    python bench_board.py -s 14 14 --seed 3 --ops get_legal_moves,do_move -o board.json
+
+Every operation is run for the player about to move in the position, in a
+loop long enough to take --min-time seconds, and the best of --repeat such
+loops is reported as operations per second.
+"""
+
+import json
+import optparse
+import random
+import time
+from board import Board, BitBoard
+from pieces import PieceList
+
+BOARD_CLASSES = {'board': Board, 'bitboard': BitBoard}
+POSITIONS = [('empty', 0.0), ('mid', 0.5), ('full', 0.9)]
+
+
+def new_board(board_class, width, height, piece_list):
+    """
+    An empty four player board, with the starting corners GameEngine uses.
+    """
+    board = board_class(width, height, 4, piece_list)
+    starts = [(0, width - 1), (height - 1, 0), (height - 1, width - 1)]
+    for player, (y, x) in enumerate(starts, 1):
+        if board_class is BitBoard:
+            board.corners[player] = 1 << (y * width + x)
+        else:
+            board.connected[player, y, x] = True
+    return board
+
+
+def random_game(width, height, piece_list, seed):
+    """
+    Returns the (player, move) list of a four player game where everyone
+    plays a random legal move until nobody can move.
+    """
+    rng = random.Random(seed)
+    board = new_board(Board, width, height, piece_list)
+    moves = []
+    passed = [False] * 4
+    while not all(passed):
+        for player in range(4):
+            legal = [] if passed[player] else board.get_legal_moves(player)
+            if not legal:
+                passed[player] = True
+                continue
+            move = rng.choice(legal)
+            board.add_move(player, move)
+            moves.append((player, move))
+    return moves
+
+
+def make_positions(board_class, width, height, piece_list, seed):
+    """
+    Returns (name, board, player to move) for each of POSITIONS, replaying
+    the first moves of random_game(seed) on a <board_class> board.
+    """
+    moves = random_game(width, height, piece_list, seed)
+    positions = []
+    for name, fraction in POSITIONS:
+        board = new_board(board_class, width, height, piece_list)
+        played = int(fraction * len(moves))
+        for player, move in moves[:played]:
+            board.add_move(player, move)
+        positions.append((name, board, moves[played][0] if played < len(moves) else 0))
+    return positions
+
+
+def sample_moves(board, player, count=256, seed=0):
+    """
+    Returns <count> moves to check on <board>: half of them legal for
+    <player> (if there are any), the other half any placement of the table.
+    """
+    rng = random.Random(seed)
+    table = board.placements
+    legal = board.get_legal_moves(player)
+    moves = [table.get_move(rng.randrange(len(table))) for _ in range(count // 2 if legal else count)]
+    moves += [rng.choice(legal) for _ in range(count - len(moves))]
+    rng.shuffle(moves)
+    return moves
+
+
+def bench_get_legal_moves(board, player):
+    def run(n):
+        start = time.perf_counter()
+        for _ in range(n):
+            # forget the cached answer, so every call generates the moves
+            board._legal_moves[player] = None
+            board.get_legal_moves(player)
+        return time.perf_counter() - start
+    return run
+
+
+def bench_check_move_valid(board, player):
+    moves = sample_moves(board, player)
+
+    def run(n):
+        start = time.perf_counter()
+        for i in range(n):
+            board.check_move_valid(player, moves[i % len(moves)])
+        return time.perf_counter() - start
+    return run
+
+
+def bench_add_move(board, player):
+    moves = board.get_legal_moves(player)
+
+    def run(n):
+        elapsed = 0.0
+        for i in range(n):
+            target = board.__copy__()
+            start = time.perf_counter()
+            target.add_move(player, moves[i % len(moves)])
+            elapsed += time.perf_counter() - start
+        return elapsed
+    return run if moves else None
+
+
+def bench_do_move(board, player):
+    moves = board.get_legal_moves(player)
+
+    def run(n):
+        start = time.perf_counter()
+        for i in range(n):
+            board.do_move(player, moves[i % len(moves)])
+        return time.perf_counter() - start
+    return run if moves else None
+
+
+def bench_copy(board, player):
+    def run(n):
+        start = time.perf_counter()
+        for _ in range(n):
+            board.__copy__()
+        return time.perf_counter() - start
+    return run
+
+
+def bench_hash(board, player):
+    def run(n):
+        start = time.perf_counter()
+        for _ in range(n):
+            hash(board)
+        return time.perf_counter() - start
+    return run
+
+
+def bench_eq(board, player):
+    # an equal copy is the slowest case: every field has to be compared
+    other = board.__copy__()
+
+    def run(n):
+        start = time.perf_counter()
+        for _ in range(n):
+            board == other
+        return time.perf_counter() - start
+    return run
+
+
+OPERATIONS = {'get_legal_moves': bench_get_legal_moves, 'check_move_valid': bench_check_move_valid,
+              'add_move': bench_add_move, 'do_move': bench_do_move, '__copy__': bench_copy, '__hash__': bench_hash,
+              '__eq__': bench_eq}
+
+
+def ops_per_second(run, min_time=0.2, repeat=3):
+    """
+    Doubles the number of operations given to <run> until a loop takes
+    <min_time> seconds, then returns the best rate of <repeat> such loops.
+    """
+    n = 1
+    while run(n) < min_time:
+        n *= 2
+    return max(n / run(n) for _ in range(repeat))
+
+
+def run_benchmarks(width=20, height=20, pieces='valid_pieces.txt', seed=0, operations=OPERATIONS,
+                   board_classes=BOARD_CLASSES, min_time=0.2, repeat=3, verbose=True):
+    """
+    Returns a list of {'operation', 'position', 'board', 'ops_per_second'}
+    results (ops_per_second is None when the player has no legal move to
+    play).
+    """
+    piece_list = PieceList(pieces)
+    results = []
+    for class_name in board_classes:
+        for position, board, player in make_positions(BOARD_CLASSES[class_name], width, height, piece_list, seed):
+            for operation in operations:
+                run = OPERATIONS[operation](board, player)
+                rate = None if run is None else ops_per_second(run, min_time, repeat)
+                results.append({'operation': operation, 'position': position, 'board': class_name,
+                                'ops_per_second': rate})
+                if verbose:
+                    print('%-9s %-6s %-17s %s' % (class_name, position, operation,
+                                                  '-' if rate is None else '%12.0f ops/s' % rate))
+    return results
+
+
+def main():
+    usage = """
+    USAGE:      python bench_board.py <options>
+    EXAMPLES:  (1) python bench_board.py
+                  - benchmarks every operation on a 20x20 board with valid_pieces.txt
+               (2) python bench_board.py -b bitboard --ops get_legal_moves -o board.json
+                  - benchmarks move generation on BitBoard only and stores the results
+    """
+    parser = optparse.OptionParser(usage)
+    parser.add_option('-s', '--board-size', dest='size', type='int', nargs=2, default=(20, 20),
+                      help='the size of the boards [default: %default]')
+    parser.add_option('-p', '--pieces', dest='pieces', default='valid_pieces.txt',
+                      help='the piece list of the game [default: %default]')
+    parser.add_option('--seed', dest='seed', type='int', default=0,
+                      help='seed of the random game the positions come from [default: %default]')
+    parser.add_option('--ops', dest='ops', default=','.join(OPERATIONS),
+                      help='comma separated operations to run [default: %default]')
+    parser.add_option('-b', '--boards', dest='boards', default=','.join(BOARD_CLASSES),
+                      help='comma separated board classes to run [default: %default]')
+    parser.add_option('--min-time', dest='min_time', type='float', default=0.2,
+                      help='seconds each timed loop runs at least [default: %default]')
+    parser.add_option('-n', '--repeat', dest='repeat', type='int', default=3,
+                      help='timed loops per benchmark, the fastest is kept [default: %default]')
+    parser.add_option('-o', '--output', dest='output', default=None, help='write the results to this JSON file')
+    options, _ = parser.parse_args()
+
+    results = run_benchmarks(options.size[1], options.size[0], options.pieces, options.seed, options.ops.split(','),
+                             options.boards.split(','), options.min_time, options.repeat)
+    if options.output is not None:
+        with open(options.output, 'w') as f:
+            json.dump({'size': options.size, 'pieces': options.pieces, 'seed': options.seed, 'results': results},
+                      f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
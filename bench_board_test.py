@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from bench_board import BitBoard, Board, OPERATIONS, make_positions, run_benchmarks
+from pieces import PieceList
+
+
+class TestBenchBoard(unittest.TestCase):
+
+    def test_positions(self):
+        piece_list = PieceList('valid_pieces.txt')
+        boards = make_positions(Board, 10, 10, piece_list, 4)
+        bit_boards = make_positions(BitBoard, 10, 10, piece_list, 4)
+        self.assertEqual(['empty', 'mid', 'full'], [name for name, _, _ in boards])
+        filled = [np.count_nonzero(board.state != -1) for _, board, _ in boards]
+        self.assertEqual(0, filled[0])
+        self.assertLess(filled[1], filled[2])
+        for (_, board, player), (_, bit_board, bit_player) in zip(boards, bit_boards):
+            self.assertTrue(np.array_equal(board.state, bit_board.state))
+            self.assertEqual(player, bit_player)
+        again = make_positions(Board, 10, 10, piece_list, 4)
+        self.assertTrue(np.array_equal(boards[1][1].state, again[1][1].state))
+
+    def test_every_operation(self):
+        results = run_benchmarks(8, 8, 'small_set.txt', min_time=0.001, repeat=1, verbose=False)
+        self.assertEqual(2 * 3 * len(OPERATIONS), len(results))
+        self.assertTrue(all(result['ops_per_second'] > 0 for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
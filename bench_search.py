@@ -0,0 +1,239 @@
+"""
+Benchmarks the Blokus search problems.
+
+Every case of the matrix (puzzle x piece set x board size x search
+function) runs in its own process, so that each gets a clean peak RSS and a
+case that runs past the timeout can be killed. The results go to a JSON
+file, which can be compared against a stored baseline:
+
+    python bench_search.py -o baseline.json
+    ... change the code ...
+    python bench_search.py -o new.json -c baseline.json
+
+A subset of the matrix can be run with the --puzzles, --pieces, --sizes and
+--searches options.
+"""
+
+import json
+import optparse
+import platform
+import resource
+import subprocess
+import sys
+import time
+from blokus_problems import BlokusFillProblem, BlokusCornersProblem, BlokusCoverProblem, ClosestLocationSearch
+from blokus_problems import blokus_corners_heuristic, blokus_cover_heuristic
+from pieces import PieceList
+from search import SearchStats, null_heuristic
+import search
+
+PUZZLES = ['fill', 'corners', 'cover', 'sub-optimal']
+PIECE_SETS = ['tiny_set.txt', 'small_set.txt', 'valid_pieces.txt']
+SIZES = [(4, 4), (5, 5), (6, 6)]
+SEARCHES = ['dfs', 'bfs', 'ucs', 'astar']
+HEURISTICS = {'fill': null_heuristic, 'corners': blokus_corners_heuristic, 'cover': blokus_cover_heuristic}
+
+
+def cover_targets(width, height):
+    """
+    The cells to cover on a <width> x <height> board: the middle of the two
+    edges away from the start.
+    """
+    return [(height - 1, width // 2), (height // 2, width - 1)]
+
+
+def diagonal_targets(width, height):
+    """
+    The cells to cover in the sub-optimal puzzle: the diagonal from the
+    start, which its greedy search can reach one target at a time.
+    """
+    return [(i, i) for i in range(1, min(width, height))]
+
+
+def make_cases(puzzles=PUZZLES, piece_sets=PIECE_SETS, sizes=SIZES, searches=SEARCHES):
+    """
+    Returns the benchmark matrix, as a list of dicts. The sub-optimal puzzle
+    is only solved by its own search ('closest').
+    """
+    cases = []
+    for puzzle in puzzles:
+        for pieces in piece_sets:
+            for width, height in sizes:
+                for search_name in (['closest'] if puzzle == 'sub-optimal' else searches):
+                    cases.append({'puzzle': puzzle, 'pieces': pieces, 'width': width, 'height': height,
+                                  'search': search_name})
+    return cases
+
+
+def case_name(case):
+    return '%s/%s/%dx%d/%s' % (case['puzzle'], case['pieces'], case['width'], case['height'], case['search'])
+
+
+def run_case(case):
+    """
+    Solves one case in this process and returns its result: wall time,
+    expanded nodes, solution cost (None if there is no solution) and peak
+    RSS in KiB, plus the SearchStats of the optimal searches.
+    """
+    piece_list = PieceList(case['pieces'])
+    width, height = case['width'], case['height']
+    puzzle = case['puzzle']
+    result = {}
+    if puzzle == 'sub-optimal':
+        problem = ClosestLocationSearch(width, height, piece_list, targets=diagonal_targets(width, height), seed=0)
+        start = time.perf_counter()
+        actions = problem.solve()
+        elapsed = time.perf_counter() - start
+        board = problem.get_start_state().__copy__()
+        for action in actions:
+            board.add_move(0, action)
+        result['uncovered'] = int(problem.objective_function(board))
+        cost = sum(action.piece.get_num_tiles() for action in actions)
+    else:
+        if puzzle == 'fill':
+            problem = BlokusFillProblem(width, height, piece_list)
+        elif puzzle == 'corners':
+            problem = BlokusCornersProblem(width, height, piece_list)
+        else:
+            problem = BlokusCoverProblem(width, height, piece_list, targets=cover_targets(width, height))
+        stats = SearchStats()
+        start = time.perf_counter()
+        search_func = getattr(search, case['search'])
+        if case['search'] == 'astar':
+            actions = search_func(problem, HEURISTICS[puzzle], stats=stats)
+        else:
+            actions = search_func(problem, stats=stats)
+        elapsed = time.perf_counter() - start
+        cost = None if actions is None else problem.get_cost_of_actions(actions)
+        result['stats'] = stats.as_dict()
+    result.update({'status': 'ok', 'seconds': elapsed, 'expanded': problem.expanded, 'cost': cost,
+                   'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss})
+    return result
+
+
+def run_case_process(case, timeout):
+    """
+    run_case in a new interpreter. A case that takes longer than <timeout>
+    seconds or fails gets a 'timeout' or 'error' status.
+    """
+    try:
+        process = subprocess.run([sys.executable, __file__, '--run-case', json.dumps(case)],
+                                 capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'status': 'timeout', 'seconds': timeout}
+    if process.returncode != 0:
+        return {'status': 'error', 'error': process.stderr.strip().splitlines()[-1:]}
+    return json.loads(process.stdout.splitlines()[-1])
+
+
+def run_benchmarks(cases, timeout=60.0, repeat=1, verbose=True):
+    """
+    Runs every case <repeat> times, keeping the fastest run, and returns the
+    benchmark report.
+    """
+    results = []
+    for case in cases:
+        best = None
+        for _ in range(repeat):
+            result = run_case_process(case, timeout)
+            if best is None or (result['status'] == 'ok' and result['seconds'] < best['seconds']):
+                best = result
+            if result['status'] != 'ok':
+                break
+        best = dict(case, name=case_name(case), **best)
+        results.append(best)
+        if verbose:
+            print(format_result(best))
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'timeout': timeout,
+            'results': results}
+
+
+def format_result(result):
+    if result['status'] != 'ok':
+        return '%-40s %s' % (result['name'], result['status'])
+    return '%-40s %8.3fs %9d expanded  cost %-5s %7d KiB' % (result['name'], result['seconds'], result['expanded'],
+                                                              result['cost'], result['peak_rss_kb'])
+
+
+def compare(report, baseline, tolerance=0.1):
+    """
+    Compares <report> with a <baseline> report, case by case, and returns the
+    list of regressions found: a case that stopped succeeding, a different
+    solution cost, number of expanded nodes or of uncovered targets, or a
+    wall time or peak RSS more than <tolerance> (a fraction) above the
+    baseline's.
+    """
+    previous = {result['name']: result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(result['name'])
+        if old is None or old['status'] != 'ok':
+            continue
+        name = result['name']
+        if result['status'] != 'ok':
+            regressions.append('%s: %s' % (name, result['status']))
+            continue
+        if result['cost'] != old['cost']:
+            regressions.append('%s: cost %s -> %s' % (name, old['cost'], result['cost']))
+        if result.get('uncovered') != old.get('uncovered'):
+            regressions.append('%s: uncovered %s -> %s' % (name, old.get('uncovered'), result.get('uncovered')))
+        if result['expanded'] != old['expanded']:
+            regressions.append('%s: expanded %d -> %d' % (name, old['expanded'], result['expanded']))
+        for key in ['seconds', 'peak_rss_kb']:
+            if result[key] > old[key] * (1 + tolerance):
+                regressions.append('%s: %s %s -> %s (%+.0f%%)' % (name, key, old[key], result[key],
+                                                                   100.0 * (result[key] / old[key] - 1)))
+    return regressions
+
+
+def main():
+    usage = """
+    USAGE:      python bench_search.py <options>
+    EXAMPLES:  (1) python bench_search.py -o baseline.json
+                  - runs the whole matrix and stores the results
+               (2) python bench_search.py --puzzles cover --sizes 5x5 -c baseline.json
+                  - runs the 5x5 cover cases and compares them with the stored results
+    """
+    parser = optparse.OptionParser(usage)
+    parser.add_option('--puzzles', dest='puzzles', default=','.join(PUZZLES),
+                      help='comma separated puzzles to run [default: %default]')
+    parser.add_option('--pieces', dest='pieces', default=','.join(PIECE_SETS),
+                      help='comma separated piece sets to run [default: %default]')
+    parser.add_option('--sizes', dest='sizes', default=','.join('%dx%d' % size for size in SIZES),
+                      help='comma separated board sizes, WxH [default: %default]')
+    parser.add_option('--searches', dest='searches', default=','.join(SEARCHES),
+                      help='comma separated search functions [default: %default]')
+    parser.add_option('-T', '--timeout', dest='timeout', type='float', default=60.0,
+                      help='seconds before a case is killed [default: %default]')
+    parser.add_option('-n', '--repeat', dest='repeat', type='int', default=1,
+                      help='runs per case, the fastest one is kept [default: %default]')
+    parser.add_option('-o', '--output', dest='output', default=None, help='write the results to this JSON file')
+    parser.add_option('-c', '--compare', dest='baseline', default=None,
+                      help='compare the results with this JSON file from an earlier run')
+    parser.add_option('--tolerance', dest='tolerance', type='float', default=0.1,
+                      help='allowed slowdown (and memory growth) against the baseline [default: %default]')
+    parser.add_option('--run-case', dest='run_case', default=None, help=optparse.SUPPRESS_HELP)
+    options, _ = parser.parse_args()
+
+    if options.run_case is not None:
+        print(json.dumps(run_case(json.loads(options.run_case))))
+        return 0
+
+    sizes = [tuple(int(n) for n in size.split('x')) for size in options.sizes.split(',')]
+    cases = make_cases(options.puzzles.split(','), options.pieces.split(','), sizes, options.searches.split(','))
+    report = run_benchmarks(cases, options.timeout, options.repeat)
+    if options.output is not None:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if options.baseline is not None:
+        with open(options.baseline) as f:
+            regressions = compare(report, json.load(f), options.tolerance)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        print('%d regressions' % len(regressions))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import unittest
+from bench_search import compare, make_cases, run_case, run_case_process
+
+
+class TestBenchSearch(unittest.TestCase):
+
+    def test_matrix(self):
+        cases = make_cases(['corners', 'sub-optimal'], ['tiny_set.txt', 'small_set.txt'], [(4, 4)], ['bfs', 'astar'])
+        self.assertEqual(6, len(cases))
+        self.assertEqual(['closest'], [case['search'] for case in cases if case['puzzle'] == 'sub-optimal'][:1])
+
+    def test_run_case(self):
+        case = make_cases(['cover'], ['small_set.txt'], [(4, 4)], ['astar'])[0]
+        result = run_case(case)
+        self.assertEqual(('ok', 6), (result['status'], result['cost']))
+        self.assertEqual(result['expanded'], result['stats']['expanded'])
+        self.assertGreater(result['peak_rss_kb'], 0)
+        self.assertEqual(result['cost'], run_case_process(case, timeout=60)['cost'])
+
+    def test_compare(self):
+        old = {'name': 'a', 'status': 'ok', 'cost': 6, 'expanded': 90, 'seconds': 1.0, 'peak_rss_kb': 1000}
+        new = dict(old, seconds=1.05)
+        self.assertEqual([], compare({'results': [new]}, {'results': [old]}))
+        new = dict(old, seconds=2.0, expanded=91)
+        self.assertEqual(2, len(compare({'results': [new]}, {'results': [old]})))
+        self.assertEqual(['a: timeout'], compare({'results': [{'name': 'a', 'status': 'timeout'}]},
+                                                 {'results': [old]}))
+
+
+if __name__ == '__main__':
+    unittest.main()
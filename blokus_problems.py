@@ -1,18 +1,99 @@
-from board import Board
-from search import SearchProblem, Node, STATE_SUCCESSOR, MOVE_SUCCESSOR
-from random import choice
+from board import Board, legal_placements
+from search import SearchProblem
+from random import Random
+import heapq
+import itertools
+import time
 import util
 import numpy as np
 
 
+class BoardSymmetries:
+    """
+    The rotations and reflections of a board_w x board_h board that keep a
+    puzzle's starting point in place and map its set of targets onto itself.
+
+    Boards that are images of each other under one of these symmetries are
+    interchangeable for the puzzle, so canonical_key gives them all the same
+    key (e.g. for a search.TranspositionTable).
+    """
+
+    def __init__(self, board_w, board_h, starting_point=(0, 0), targets=()):
+        cells = np.arange(board_w * board_h).reshape((board_h, board_w))
+        images = [cells, cells[::-1], cells[:, ::-1], cells[::-1, ::-1]]
+        if board_w == board_h:
+            images += [cells.T, cells.T[::-1], cells.T[:, ::-1], cells.T[::-1, ::-1]]
+
+        start = starting_point[0] * board_w + starting_point[1]
+        target_cells = {row * board_w + col for (row, col) in targets}
+        # image.ravel()[i] is the cell that ends up at cell i
+        self.permutations = [image.ravel() for image in images
+                             if image.ravel()[start] == start
+                             and {image.ravel()[t] for t in target_cells} == target_cells]
+
+    def canonical_key(self, state):
+        """
+        Return a key for <state> shared by all its symmetric images.
+        """
+        cells = state.state.ravel()
+        return min(cells[permutation].tobytes() for permutation in self.permutations), state.pieces.tobytes()
+
+
+class TargetScorer:
+    """
+    Scores batches of placements against the target cells of a puzzle
+    without building any board. Placements are given as rows of
+    PlacementTable.cells (flat cell indices, padded by repeating the first
+    one), and get:
+    - covered: how many of the targets still uncovered on the board the
+      placement covers (a target listed twice counts twice)
+    - distance: the Chebyshev distance from the placement's nearest tile to
+      the nearest uncovered target (0 if it covers one, or if none is left)
+
+    Targets are (row, col) pairs, like the puzzles' targets.
+    """
+
+    def __init__(self, targets, board_w, board_h):
+        targets = np.array(targets).reshape((-1, 2))
+        self.board_w = board_w
+        self.board_h = board_h
+        self.flat_targets = targets[:, 0] * board_w + targets[:, 1]
+        rows, cols = np.divmod(np.arange(board_w * board_h), board_w)
+        # distances[c, t] is the Chebyshev distance from cell c to target t
+        self.distances = np.maximum(np.abs(rows[:, None] - targets[:, 0]), np.abs(cols[:, None] - targets[:, 1]))
+
+    def uncovered(self, state):
+        """
+        Returns a boolean array telling which targets are free on <state>.
+        """
+        return state.state.ravel()[self.flat_targets] == -1
+
+    def score(self, state, cells):
+        """
+        Returns the (covered, distance) arrays of the placements in <cells>
+        (an N x 5 array) on <state>.
+        """
+        uncovered = self.uncovered(state)
+        weights = np.bincount(self.flat_targets[uncovered], minlength=self.board_w * self.board_h)
+        real_tiles = np.ones(cells.shape, np.bool_)
+        real_tiles[:, 1:] = cells[:, 1:] != cells[:, :1]
+        covered = (weights[cells] * real_tiles).sum(axis=1)
+        if uncovered.any():
+            distance = self.distances[:, uncovered].min(axis=1)[cells].min(axis=1)
+        else:
+            distance = np.zeros(len(cells), self.distances.dtype)
+        return covered, distance
+
+
 class BlokusFillProblem(SearchProblem):
     """
     A one-player Blokus game as a search problem.
     This problem is implemented for you. You should NOT change it!
     """
 
-    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0)):
-        self.board = Board(board_w, board_h, 1, piece_list, starting_point)
+    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0), board_class=Board):
+        self.board = board_class(board_w, board_h, 1, piece_list, starting_point)
+        self.symmetries = BoardSymmetries(board_w, board_h, starting_point)
         self.expanded = 0
 
     def get_start_state(self):
@@ -40,7 +121,7 @@ class BlokusFillProblem(SearchProblem):
         """
         # Note that for the search problem, there is only one player - #0
         self.expanded = self.expanded + 1
-        return [(state.do_move(0, move), move, 1) for move in state.get_legal_moves(0)]
+        return [(state.do_move_lazy(0, move), move, 1) for move in state.get_legal_moves(0)]
 
     def get_cost_of_actions(self, actions):
         """
@@ -57,7 +138,7 @@ class BlokusFillProblem(SearchProblem):
 # This portion is incomplete.  Time to write code!  #
 #####################################################
 class BlokusCornersProblem(SearchProblem):
-    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0)):
+    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0), board_class=Board):
         targets = np.array([
             (0, 0),
             (board_h - 1, 0),
@@ -66,7 +147,9 @@ class BlokusCornersProblem(SearchProblem):
         ])
         self.target_rows = targets[:,0]
         self.target_cols = targets[:,1]
-        self.board = Board(board_w, board_h, 1, piece_list, starting_point)
+        self.board = board_class(board_w, board_h, 1, piece_list, starting_point)
+        self.symmetries = BoardSymmetries(board_w, board_h, starting_point, targets)
+        self.scorer = TargetScorer(targets, board_w, board_h)
         self.expanded = 0
 
     def get_start_state(self):
@@ -93,7 +176,7 @@ class BlokusCornersProblem(SearchProblem):
         """
         # Note that for the search problem, there is only one player - #0
         self.expanded = self.expanded + 1
-        return [(state.do_move(0, move), move, move.piece.get_num_tiles()) for move in state.get_legal_moves(0)]
+        return [(state.do_move_lazy(0, move), move, move.piece.get_num_tiles()) for move in state.get_legal_moves(0)]
 
     def get_cost_of_actions(self, actions):
         """
@@ -129,12 +212,14 @@ def blokus_corners_heuristic(state, problem):
 
 
 class BlokusCoverProblem(SearchProblem):
-    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0), targets=[(0, 0)]):
+    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0), targets=[(0, 0)], board_class=Board):
         self.targets = np.array(targets)
         self.target_rows = self.targets[:,0]
         self.target_cols = self.targets[:,1]
         self.expanded = 0
-        self.board = Board(board_w, board_h, 1, piece_list, starting_point)
+        self.board = board_class(board_w, board_h, 1, piece_list, starting_point)
+        self.symmetries = BoardSymmetries(board_w, board_h, starting_point, self.targets)
+        self.scorer = TargetScorer(self.targets, board_w, board_h)
 
     def get_start_state(self):
         """
@@ -160,7 +245,7 @@ class BlokusCoverProblem(SearchProblem):
         """
         # Note that for the search problem, there is only one player - #0
         self.expanded = self.expanded + 1
-        return [(state.do_move(0, move), move, move.piece.get_num_tiles()) for move in state.get_legal_moves(0)]
+        return [(state.do_move_lazy(0, move), move, move.piece.get_num_tiles()) for move in state.get_legal_moves(0)]
 
     def get_cost_of_actions(self, actions):
         """
@@ -185,13 +270,16 @@ class ClosestLocationSearch:
     but the objective is speed, not optimality.
     """
 
-    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0), targets=(0, 0)):
+    def __init__(self, board_w, board_h, piece_list, starting_point=(0, 0), targets=(0, 0), board_class=Board,
+                 seed=None):
         self.expanded = 0
+        self.random = Random(seed)
         self.targets = np.array(targets.copy())
         self.target_rows = self.targets[:,0]
         self.target_cols = self.targets[:,1]
         self.n_iter = 10 * board_w * board_h
-        self.board = Board(board_w, board_h, 1, piece_list, starting_point)
+        self.board = board_class(board_w, board_h, 1, piece_list, starting_point)
+        self.scorer = TargetScorer(self.targets, board_w, board_h)
 
     def get_start_state(self):
         """
@@ -215,36 +303,129 @@ class ClosestLocationSearch:
                 self.target_cols
                 ] == -1) == 0
 
-    def solve(self):
+    def solve(self, deadline=None):
         """
         This method should return a sequence of actions that covers all target locations on the board.
         This time we trade optimality for speed.
         Therefore, your agent should try and cover one target location at a time. Each time, aiming for the closest uncovered location.
         You may define helpful functions as you wish.
+
+        Ties are broken with self.random; if a <deadline> (a time.time()
+        value) is given, the actions found so far are returned once it passes.
+
+        The legal moves are scored against the targets directly (see
+        TargetScorer), so only the chosen move is ever played on a board.
         """
         t = 0
-        current = Node(self.get_start_state())
-        backtrace  = []
+        board = self.get_start_state().__copy__()
+        objective = self.objective_function(board)
+        backtrace = []
         while True:
-            if t == self.n_iter - 1 or self.is_goal_state(current.state):
+            if t == self.n_iter - 1 or objective == 0:
+                return backtrace
+            if deadline is not None and time.time() > deadline:
                 return backtrace
-            successors = self.get_successors(current.state)
-            successors.sort(key=lambda successor: self.objective_function(successor[STATE_SUCCESSOR]))
-            if len(successors) == 0:
+            self.expanded += 1
+            placement_ids = legal_placements(board, 0)
+            if len(placement_ids) == 0:
                 return backtrace
-            best_score = self.objective_function(successors[0][STATE_SUCCESSOR])
-            best_successors = [successor for successor in successors
-                               if self.objective_function(successor[STATE_SUCCESSOR]) == best_score]
-            successor = choice(best_successors)
-            candidate = Node(successor[STATE_SUCCESSOR], parent=current, spawned_action=successor[MOVE_SUCCESSOR])
-            delta_e = self.objective_function(candidate.state) - self.objective_function(current.state)
-            if delta_e < 0:
-                current = candidate
-                backtrace.append(current.spawned_action)
+            covered = self.scorer.score(board, board.placements.cells[placement_ids])[0]
+            best_covered = covered.max()
+            if best_covered == 0:
+                # no move improves the objective, and since the board can't
+                # change anymore neither will any later one
+                return backtrace
+            move = board.placements.get_move(self.random.choice(placement_ids[covered == best_covered].tolist()))
+            board.add_move(0, move)
+            objective -= best_covered
+            backtrace.append(move)
             t += 1
 
 
 
+class BeamSearch:
+    """
+    Approximate solver for the search problems of this file (fill, corners
+    and cover): a breadth-first search that only keeps the <width> best
+    states of each depth, by lowest score. It has the same solve() and
+    expanded interface as ClosestLocationSearch; width is the knob trading
+    time for solution quality (1 is a greedy search).
+
+    score(state, g, problem) may return any sortable value. By default
+    states are ranked by the number of targets (or for the fill puzzle,
+    free cells) left, then by cost; this is computed from the parent and
+    the moves, so only the states kept in the beam are ever built. States
+    already seen, by board hash, are skipped.
+    """
+
+    def __init__(self, problem, width=10, score=None):
+        self.problem = problem
+        self.width = width
+        self.score = score
+        self.board = problem.board
+        self.targets = getattr(problem, 'targets', [])
+
+    @property
+    def expanded(self):
+        return self.problem.expanded
+
+    def get_start_state(self):
+        """
+        Returns the start state for the search problem
+        """
+        return self.problem.get_start_state()
+
+    def rank(self, state, g, successors):
+        """
+        Returns the scores of <successors> (as returned by get_successors) of
+        <state>, whose cost is <g>.
+        """
+        if self.score is not None:
+            return [self.score(successor, g + cost, self.problem) for successor, _, cost in successors]
+        scorer = getattr(self.problem, 'scorer', None)
+        if scorer is None:
+            free = int(np.count_nonzero(state.state == -1))
+            return [(free - action.piece.get_num_tiles(), g + cost) for _, action, cost in successors]
+        left = int(np.count_nonzero(scorer.uncovered(state)))
+        cells = state.placements.cells[[action.placement_id for _, action, _ in successors]]
+        covered = scorer.score(state, cells)[0]
+        return [(left - count, g + cost) for count, (_, _, cost) in zip(covered.tolist(), successors)]
+
+    def solve(self):
+        """
+        Returns the cheapest sequence of actions to a goal found, or if the
+        beam never reached one, the actions leading to the best scored state.
+        """
+        counter = itertools.count()
+        start = self.get_start_state()
+        beam = [(start, 0, [])]
+        seen = {hash(start)}
+        goal = None
+        best = (None, [])
+        while beam:
+            candidates = []
+            for state, g, actions in beam:
+                successors = [successor for successor in self.problem.get_successors(state)
+                              if hash(successor[0]) not in seen]
+                seen.update(hash(successor[0]) for successor in successors)
+                for (successor, action, cost), score in zip(successors, self.rank(state, g, successors)):
+                    if goal is None or g + cost < goal[0]:
+                        candidates.append((score, next(counter), successor, g + cost, actions + [action]))
+
+            beam = []
+            for score, _, state, g, actions in heapq.nsmallest(self.width, candidates):
+                if best[0] is None or score < best[0]:
+                    best = (score, actions)
+                if self.problem.is_goal_state(state):
+                    if goal is None or g < goal[0]:
+                        goal = (g, actions)
+                else:
+                    beam.append((state, g, actions))
+            if goal is not None:
+                beam = [entry for entry in beam if entry[1] < goal[0]]
+        return goal[1] if goal is not None else best[1]
+
+
 class MiniContestSearch:
     """
     Implement your contest entry here
@@ -0,0 +1,98 @@
+import unittest
+from blokus_problems import BeamSearch, BlokusCoverProblem, BlokusFillProblem, ClosestLocationSearch, TargetScorer
+from board import Board
+from pieces import PieceList
+
+
+def reference_solve(problem):
+    """
+    ClosestLocationSearch.solve as it was first written: builds every
+    successor board and scores each of them with objective_function.
+    """
+    t = 0
+    current = problem.get_start_state()
+    backtrace = []
+    while True:
+        if t == problem.n_iter - 1 or problem.is_goal_state(current):
+            return backtrace
+        successors = [(current.do_move(0, move), move) for move in current.get_legal_moves(0)]
+        successors.sort(key=lambda successor: problem.objective_function(successor[0]))
+        if len(successors) == 0:
+            return backtrace
+        best_score = problem.objective_function(successors[0][0])
+        best_successors = [successor for successor in successors
+                           if problem.objective_function(successor[0]) == best_score]
+        state, move = problem.random.choice(best_successors)
+        if problem.objective_function(state) < problem.objective_function(current):
+            current = state
+            backtrace.append(move)
+        t += 1
+
+
+class TestClosestLocationSearch(unittest.TestCase):
+
+    def make_problem(self, seed):
+        return ClosestLocationSearch(7, 7, PieceList('valid_pieces.txt'), targets=[(0, 3), (3, 0), (5, 5), (5, 5)],
+                                     seed=seed)
+
+    def test_same_moves_as_reference(self):
+        # seed 1 stalls with a target left
+        for seed in [0, 1, 5]:
+            expected = reference_solve(self.make_problem(seed))
+            actual = self.make_problem(seed).solve()
+            self.assertEqual([move.placement_id for move in expected], [move.placement_id for move in actual])
+
+
+class TestTargetScorer(unittest.TestCase):
+
+    def test_matches_boards(self):
+        targets = [(0, 3), (3, 0), (5, 5), (5, 5), (6, 2)]
+        scorer = TargetScorer(targets, 7, 8)
+        board = Board(7, 8, 1, PieceList('valid_pieces.txt'))
+        board = board.do_move(0, board.get_legal_moves(0)[-1])
+        moves = board.get_legal_moves(0)
+        covered, distance = scorer.score(board, board.placements.cells[[move.placement_id for move in moves]])
+
+        free = [(row, col) for (row, col) in targets if board.state[row, col] == -1]
+        for move, move_covered, move_distance in zip(moves, covered, distance):
+            tiles = [(move.y + y, move.x + x) for (x, y) in move.orientation]
+            self.assertEqual(sum(target in tiles for target in free), move_covered)
+            self.assertEqual(min(max(abs(row - r), abs(col - c)) for (row, col) in free for (r, c) in tiles),
+                             move_distance)
+
+
+class TestBeamSearch(unittest.TestCase):
+
+    def make_problem(self):
+        return BlokusCoverProblem(8, 8, PieceList('valid_pieces.txt'), targets=[(7, 7), (0, 7), (7, 0)])
+
+    def assert_solved(self, problem, actions):
+        board = problem.get_start_state().__copy__()
+        for action in actions:
+            board.add_move(0, action)
+        self.assertTrue(problem.is_goal_state(board))
+
+    def test_cover(self):
+        problem = self.make_problem()
+        beam = BeamSearch(problem, width=1)
+        self.assert_solved(problem, beam.solve())
+        self.assertEqual(beam.expanded, problem.expanded)
+
+    def test_fill_ranking(self):
+        problem = BlokusFillProblem(5, 5, PieceList('small_set.txt'))
+        start = problem.get_start_state()
+        successors = problem.get_successors(start)
+        ranks = BeamSearch(problem).rank(start, 0, successors)
+        self.assertEqual([(25 - action.piece.get_num_tiles(), 1) for _, action, _ in successors], ranks)
+        self.assertGreater(len(set(ranks)), 1)
+        self.assertTrue(all(type(value) is int for rank in ranks for value in rank))
+
+    def test_score_function(self):
+        problem = self.make_problem()
+        left = lambda state, g, problem: (problem.scorer.uncovered(state).sum(), g)
+        expected = BeamSearch(self.make_problem(), width=3).solve()
+        self.assertEqual([move.placement_id for move in expected],
+                         [move.placement_id for move in BeamSearch(problem, width=3, score=left).solve()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,15 @@ class Board:
       diagonally connected to another one of the player's tiles
     - piece_list: A PieceList object (probably shared with the game engine) to
       help understand the moves
+    - placements: the PlacementTable for this piece list and board size, shared
+      by every board with the same geometry
+    - _legal_moves: for each player, None or an (ids, pending) pair: ids is a
+      sorted array of the placements the player could play before the moves
+      in pending (a tuple of (player, placement id)) were added. See
+      legal_placements; once a player's moves have been asked for, _legal and
+      connected should only be changed through add_move
+    - _hash: the Zobrist hash of the board (see ZobristKeys), updated by
+      add_move
     """
 
     def __init__(self, board_w, board_h, num_players, piece_list, starting_point=(0, 0)):
@@ -33,6 +42,10 @@ class Board:
         self.connected[0, starting_point[0], starting_point[1]] = True
         self.piece_list = piece_list
         self.pieces = np.full((num_players, piece_list.get_num_pieces()), True, np.bool_)
+        self.placements = PlacementTable.get(piece_list, board_w, board_h)
+        self._legal_moves = [None] * num_players
+        self._undo = []
+        self._hash = 0
 
     def add_move(self, player, move):
         """
@@ -78,6 +91,9 @@ class Board:
             if x < self.board_w - 1 and y > 0:
                 self.connected[player, y - 1, x + 1] = True
 
+        placement_id = self.placements.find(move)
+        record_move(self, player, placement_id)
+        self._hash ^= self.placements.zobrist_keys(self.num_players).move_key(player, placement_id)
         self.scores[player] += piece.get_num_tiles()
         return piece.get_num_tiles()
 
@@ -90,22 +106,74 @@ class Board:
 
         return new_board
 
+    def do_move_lazy(self, player, move):
+        """
+        Like do_move, but the new board is only built when it is first used.
+        """
+        return LazyBoard(self, player, move)
+
+    def push_move(self, player, move):
+        """
+        Add <player>'s <move> in place, like add_move, but remember what it
+        changed so that pop_move can take it back.
+
+        Returns the number of tiles placed on the board.
+        """
+        xs = [x + move.x for (x, _) in move.orientation]
+        ys = [y + move.y for (_, y) in move.orientation]
+        region = (slice(max(min(ys) - 1, 0), max(ys) + 2), slice(max(min(xs) - 1, 0), max(xs) + 2))
+        undo = (player, move, region,
+                self.state[region].copy(),
+                self._legal[(slice(None),) + region].copy(),
+                self.connected[(player,) + region].copy(),
+                self._legal_moves[:],
+                self._hash)
+        tiles = self.add_move(player, move)
+        self._undo.append(undo)
+        return tiles
+
+    def pop_move(self):
+        """
+        Take back the last move added with push_move, and return it.
+        """
+        player, move, region, state, legal, connected, legal_moves, self._hash = self._undo.pop()
+        self.state[region] = state
+        self._legal[(slice(None),) + region] = legal
+        self.connected[(player,) + region] = connected
+        self._legal_moves = legal_moves
+        self.pieces[player, move.piece_index] = True
+        self.scores[player] -= move.piece.get_num_tiles()
+        return move
+
     def get_legal_moves(self, player):
         """
-        Returns a list of legal moves for given player for this board state 
-        """
-        # Generate all legal moves
-        move_list = []
-        for piece in self.piece_list:
-            for x in range(self.board_w):
-                for y in range(self.board_h):
-                    for ori in piece:
-                        new_move = Move(piece,
-                                        self.piece_list.pieces.index(piece),
-                                        ori, x, y)
-                        if self.check_move_valid(player, new_move):
-                            move_list.append(new_move)
-        return move_list
+        Returns a list of legal moves for given player for this board state
+
+        A legal move always puts one of its tiles on a free cell that is
+        diagonally connected to the player, so only the placements covering
+        one of those corners are checked. The moves are returned in the same
+        (piece, x, y, orientation) order as a full scan would give.
+        """
+        return [self.placements.get_move(i) for i in legal_placements(self, player).tolist()]
+
+    def open_corners(self, player):
+        """
+        Returns the cells <player> could anchor a move on (free, legal and
+        diagonally connected), as flat indices.
+        """
+        return np.flatnonzero(self.connected[player] & self._legal[player])
+
+    def valid_placements(self, player, placement_ids):
+        """
+        Vectorized check_move_valid: returns the subset of <placement_ids> (an
+        array of PlacementTable rows) that <player> can legally play.
+        """
+        table = self.placements
+        placement_ids = placement_ids[self.pieces[player, table.piece_ids[placement_ids]]]
+        cells = table.cells[placement_ids]
+        ok = self._legal[player].ravel()[cells].all(axis=1)
+        ok &= self.connected[player].ravel()[cells].any(axis=1)
+        return placement_ids[ok]
 
     def check_move_valid(self, player, move):
         """
@@ -178,10 +246,12 @@ class Board:
         return self.scores[player]
 
     def __eq__(self, other):
+        if hash(self) != hash(other):
+            return False
         return np.array_equal(self.state, other.state) and np.array_equal(self.pieces, other.pieces)
 
     def __hash__(self):
-        return hash(str(self.state))
+        return self._hash
 
     def __str__(self):
         out_str = []
@@ -195,15 +265,369 @@ class Board:
         return ''.join(out_str)
 
     def __copy__(self):
-        cpy_board = Board(self.board_w, self.board_h, self.num_players, self.piece_list)
+        cpy_board = Board.__new__(Board)
+        cpy_board.__dict__.update(self.__dict__)
         cpy_board.state = np.copy(self.state)
         cpy_board._legal = np.copy(self._legal)
         cpy_board.connected = np.copy(self.connected)
         cpy_board.pieces = np.copy(self.pieces)
         cpy_board.scores = self.scores[:]
+        cpy_board._legal_moves = self._legal_moves[:]
+        cpy_board._undo = []
+        return cpy_board
+
+
+class BitBoard:
+    """
+    A BitBoard is a drop-in replacement for Board that keeps the board as
+    Python int bitmasks (bit y * board_w + x is cell (x, y)) instead of NumPy
+    arrays, which makes move checks a couple of integer operations and
+    copying a board a few list copies.
+
+    For each player it stores:
+    - occupied: the cells covered by the player's tiles
+    - forbidden: the cells the player can't play on (any tile, or next to one
+      of their own tiles)
+    - corners: the cells diagonally connected to the player's tiles (or their
+      starting corner)
+
+    A move is valid iff its piece is available and its mask doesn't intersect
+    forbidden but does intersect corners. state, _legal and connected are
+    still available as (read-only) arrays for code written against Board.
+    Like Board, a BitBoard keeps each player's legal moves up to date once
+    they have been asked for, and its Zobrist hash in _hash.
+    """
+
+    def __init__(self, board_w, board_h, num_players, piece_list, starting_point=(0, 0)):
+        self.board_w = board_w
+        self.board_h = board_h
+        self.num_players = num_players
+        self.scores = [0] * self.num_players
+
+        self.occupied = [0] * num_players
+        self.forbidden = [0] * num_players
+        self.corners = [0] * num_players
+        self.corners[0] = 1 << (starting_point[0] * board_w + starting_point[1])
+
+        self.piece_list = piece_list
+        self.pieces = np.full((num_players, piece_list.get_num_pieces()), True, np.bool_)
+        self.placements = PlacementTable.get(piece_list, board_w, board_h)
+        self._legal_moves = [None] * num_players
+        self._undo = []
+        self._hash = 0
+        self._state = None
+
+    def add_move(self, player, move):
+        """
+        Try to add <player>'s <move>.
+
+        If the move is legal, the board state is updated; if it's not legal, a
+        ValueError is raised.
+
+        Returns the number of tiles placed on the board.
+        """
+        if not self.check_move_valid(player, move):
+            raise ValueError("Move is not allowed")
+
+        masks = self.placements.bit_masks()
+        placement_id = self.placements.find(move)
+        mask = masks.tiles[placement_id]
+        self.pieces[player, move.piece_index] = False  # mark piece as used
+
+        self.occupied[player] |= mask
+        for p in range(self.num_players):
+            self.forbidden[p] |= mask
+        self.forbidden[player] |= masks.edges[placement_id]
+        self.corners[player] |= masks.diagonals[placement_id]
+        self._state = None
+
+        record_move(self, player, placement_id)
+        self._hash ^= self.placements.zobrist_keys(self.num_players).move_key(player, placement_id)
+        self.scores[player] += move.piece.get_num_tiles()
+        return move.piece.get_num_tiles()
+
+    def do_move(self, player, move):
+        """
+        Performs a move, returning a new board
+        """
+        new_board = self.__copy__()
+        new_board.add_move(player, move)
+
+        return new_board
+
+    def do_move_lazy(self, player, move):
+        """
+        Like do_move, but the new board is only built when it is first used.
+        """
+        return LazyBoard(self, player, move)
+
+    def push_move(self, player, move):
+        """
+        Add <player>'s <move> in place, like add_move, but remember what it
+        changed so that pop_move can take it back.
+
+        Returns the number of tiles placed on the board.
+        """
+        undo = (player, move, self.occupied[player], self.forbidden[:], self.corners[player],
+                self._legal_moves[:], self._hash)
+        tiles = self.add_move(player, move)
+        self._undo.append(undo)
+        return tiles
+
+    def pop_move(self):
+        """
+        Take back the last move added with push_move, and return it.
+        """
+        player, move, occupied, forbidden, corners, legal_moves, self._hash = self._undo.pop()
+        self.occupied[player] = occupied
+        self.forbidden = forbidden
+        self.corners[player] = corners
+        self._legal_moves = legal_moves
+        self.pieces[player, move.piece_index] = True
+        self.scores[player] -= move.piece.get_num_tiles()
+        self._state = None
+        return move
+
+    def get_legal_moves(self, player):
+        """
+        Returns a list of legal moves for given player for this board state
+        """
+        return [self.placements.get_move(i) for i in legal_placements(self, player).tolist()]
+
+    def open_corners(self, player):
+        """
+        Returns the cells <player> could anchor a move on, as flat indices.
+        """
+        return bit_indices(self.corners[player] & ~self.forbidden[player])
+
+    def valid_placements(self, player, placement_ids):
+        """
+        Returns the subset of <placement_ids> (an array of PlacementTable rows)
+        that <player> can legally play.
+        """
+        table = self.placements
+        tiles = table.bit_masks().tiles
+        forbidden = self.forbidden[player]
+        corners = self.corners[player]
+        placement_ids = placement_ids[self.pieces[player, table.piece_ids[placement_ids]]]
+        return placement_ids[[not tiles[i] & forbidden and tiles[i] & corners != 0
+                              for i in placement_ids.tolist()]]
+
+    def check_move_valid(self, player, move):
+        """
+        Check if <player> can legally perform <move>.
+
+        Return True if the move is legal or False otherwise.
+        """
+        if not self.pieces[player, move.piece_index]:
+            return False
+        placement_id = self.placements.find(move)
+        if placement_id is None:
+            # some tile is out of bounds
+            return False
+        mask = self.placements.bit_masks().tiles[placement_id]
+        return mask & self.forbidden[player] == 0 and mask & self.corners[player] != 0
+
+    def check_tile_legal(self, player, x, y):
+        """
+        Check if it's legal for <player> to place one tile at (<x>, <y>).
+        """
+        if x < 0 or x >= self.board_w or y < 0 or y >= self.board_h:
+            return False
+        return not self.forbidden[player] >> (y * self.board_w + x) & 1
+
+    def check_tile_attached(self, player, x, y):
+        """Check if (<x>, <y>) is diagonally attached to <player>'s moves.
+
+        Note that this does not check if this move is legal.
+        """
+        if x < 0 or x >= self.board_w or y < 0 or y >= self.board_h:
+            return False
+        return bool(self.corners[player] >> (y * self.board_w + x) & 1)
+
+    def get_position(self, x, y):
+        bit = 1 << (y * self.board_w + x)
+        for p in range(self.num_players):
+            if self.occupied[p] & bit:
+                return p
+        return -1
+
+    def score(self, player):
+        return self.scores[player]
+
+    def _to_array(self, masks):
+        return np.array([bit_array(mask, self.board_w * self.board_h) for mask in masks]
+                        ).reshape((len(masks), self.board_h, self.board_w))
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = np.full((self.board_h, self.board_w), -1, np.int8)
+            for p, occupied in enumerate(self._to_array(self.occupied)):
+                self._state[occupied] = p
+        return self._state
+
+    @property
+    def _legal(self):
+        return ~self._to_array(self.forbidden)
+
+    @property
+    def connected(self):
+        return self._to_array(self.corners)
+
+    def __eq__(self, other):
+        if hash(self) != hash(other):
+            return False
+        return self.occupied == other.occupied and np.array_equal(self.pieces, other.pieces)
+
+    def __hash__(self):
+        return self._hash
+
+    def __str__(self):
+        return Board.__str__(self)
+
+    def __copy__(self):
+        cpy_board = BitBoard.__new__(BitBoard)
+        cpy_board.__dict__.update(self.__dict__)
+        cpy_board.occupied = self.occupied[:]
+        cpy_board.forbidden = self.forbidden[:]
+        cpy_board.corners = self.corners[:]
+        cpy_board.pieces = np.copy(self.pieces)
+        cpy_board.scores = self.scores[:]
+        cpy_board._legal_moves = self._legal_moves[:]
+        cpy_board._undo = []
         return cpy_board
 
 
+class LazyBoard:
+    """
+    A LazyBoard stands for the board <parent>.do_move(<player>, <move>)
+    without building it: the board is only made (and the parent released) the
+    first time one of its attributes is used, so a successor sitting in a
+    search fringe costs a parent pointer and a move rather than a full board.
+    Apart from that it behaves like the board it stands for; its hash is
+    derived from the parent's without building the board.
+    """
+
+    __slots__ = ('_parent', '_player', '_move', '_board', '_hash')
+
+    def __init__(self, parent, player, move):
+        self._parent = parent
+        self._player = player
+        self._move = move
+        self._board = None
+        self._hash = None
+
+    @property
+    def board(self):
+        if self._board is None:
+            self._board = self._parent.do_move(self._player, self._move)
+            self._parent = None
+            self._move = None
+        return self._board
+
+    def __getattr__(self, name):
+        return getattr(self.board, name)
+
+    def __eq__(self, other):
+        if hash(self) != hash(other):
+            return False
+        return self.board == other
+
+    def __hash__(self):
+        if self._hash is None:
+            if self._board is not None:
+                self._hash = hash(self._board)
+            else:
+                table = self._parent.placements
+                self._hash = hash(self._parent) ^ table.zobrist_keys(self._parent.num_players).move_key(
+                    self._player, table.find(self._move))
+        return self._hash
+
+    def __str__(self):
+        return str(self.board)
+
+    def __copy__(self):
+        return self.board.__copy__()
+
+
+def legal_placements(board, player):
+    """
+    Return the sorted array of placement ids <player> can legally play on
+    <board> (a Board or BitBoard).
+
+    The first call for a player checks every placement on their open corners.
+    After that, boards only record the moves played since (see record_move),
+    and the next call only re-checks the previous answer plus the placements
+    on the corners opened by <player>'s new moves: a move can only make other
+    placements illegal, except on its own diagonals. This way a successor
+    that is never expanded doesn't pay anything for its legal moves.
+    """
+    candidates = candidate_placements(board, player)
+    if candidates is None:
+        return board._legal_moves[player][0]
+    ids = board.valid_placements(player, candidates)
+    board._legal_moves[player] = (ids, ())
+    return ids
+
+
+def candidate_placements(board, player):
+    """
+    Return the sorted array of placement ids legal_placements has to check
+    for <player> on <board>, or None if the board's answer is up to date.
+    """
+    table = board.placements
+    legal = board._legal_moves[player]
+    if legal is None:
+        return table.covering(board.open_corners(player))
+    if not legal[1]:
+        return None
+    ids, pending = legal
+    corners = [c for (mover, placement_id) in pending if mover == player
+               for c in table.neighbourhood(placement_id)[2]]
+    return sorted_unique(np.concatenate((ids, table.covering(corners))))
+
+
+def record_move(board, player, placement_id):
+    """
+    Remember that <player> played <placement_id> on <board>, for the players
+    whose legal moves the board is keeping track of.
+    """
+    for p, legal in enumerate(board._legal_moves):
+        if legal is not None:
+            board._legal_moves[p] = (legal[0], legal[1] + ((player, placement_id),))
+
+
+def sorted_unique(array):
+    """
+    np.unique for small integer arrays (without its hashing overhead).
+    """
+    array = np.sort(array)
+    if len(array) == 0:
+        return array
+    return array[np.concatenate(([True], array[1:] != array[:-1]))]
+
+
+def bit_indices(mask):
+    """
+    Return the indices of the set bits of <mask>, in increasing order.
+    """
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+def bit_array(mask, length):
+    """
+    Return the first <length> bits of <mask> as a boolean array.
+    """
+    packed = np.frombuffer(mask.to_bytes((length + 7) // 8, 'little'), np.uint8)
+    return np.unpackbits(packed, bitorder='little')[:length].astype(np.bool_)
+
+
 class Move:
     """
     A Move describes how one of the players is going to spend their move.
@@ -215,12 +639,13 @@ class Move:
     - Flip: whether the piece should be flipped (True/False)
     """
 
-    def __init__(self, piece, piece_index, orientation, x=0, y=0):
+    def __init__(self, piece, piece_index, orientation, x=0, y=0, placement_id=None):
         self.piece = piece
         self.piece_index = piece_index
         self.x = x
         self.y = y
         self.orientation = orientation
+        self.placement_id = placement_id
 
     def __str__(self):
         out_str = [[' ' for _ in range(5)] for _ in range(5)]
@@ -231,3 +656,243 @@ class Move:
              for y_val in range(5)]
         )
         return ''.join(out_str) + "x: " + str(self.x) + " y: " + str(self.y)
+
+
+class PlacementTable:
+    """
+    A PlacementTable lists every in-bounds placement of every piece of a
+    PieceList on a board of a given size. Tables are built once per geometry
+    (see PlacementTable.get) and shared by every Board using it.
+
+    Placements are numbered in (piece, x, y, orientation) order and stored as
+    flat NumPy arrays:
+    - cells: an N x 5 array of the flat (y * board_w + x) cell index of each
+      tile; placements with fewer than 5 tiles repeat their first cell
+    - num_tiles: the number of real tiles in each row of cells
+    - piece_ids/orientation_ids: which piece and which of its orientations
+      (in the piece's iteration order) the placement uses
+    - xs/ys: the offset of the placement, as in Move.x/Move.y
+    - cell_start/cell_placements: for each cell c, the ids of the placements
+      covering it are cell_placements[cell_start[c]:cell_start[c + 1]]
+    """
+
+    _cache = {}
+
+    def __init__(self, piece_list, board_w, board_h):
+        self.board_w = board_w
+        self.board_h = board_h
+        self.pieces = list(piece_list)
+        self.orientations = [list(piece) for piece in self.pieces]
+
+        rows = []
+        for piece_index, orientations in enumerate(self.orientations):
+            for ori_index, ori in enumerate(orientations):
+                tiles = sorted(ori)
+                tile_xs = np.array([x for (x, _) in tiles])
+                tile_ys = np.array([y for (_, y) in tiles])
+                xs, ys = np.meshgrid(np.arange(board_w - tile_xs.max()),
+                                     np.arange(board_h - tile_ys.max()), indexing='ij')
+                xs, ys = xs.ravel(), ys.ravel()
+                cells = np.empty((len(xs), 5), np.int32)
+                cells[:] = ((ys[:, None] + tile_ys[0]) * board_w + xs[:, None] + tile_xs[0])
+                cells[:, :len(tiles)] = (ys[:, None] + tile_ys) * board_w + xs[:, None] + tile_xs
+                rows.append((np.full(len(xs), piece_index), xs, ys,
+                             np.full(len(xs), ori_index), np.full(len(xs), len(tiles)), cells))
+
+        piece_ids, xs, ys, orientation_ids, num_tiles, cells = (np.concatenate(column) for column in zip(*rows))
+        order = np.lexsort((orientation_ids, ys, xs, piece_ids))
+        self.piece_ids = piece_ids[order].astype(np.int16)
+        self.xs = xs[order].astype(np.int16)
+        self.ys = ys[order].astype(np.int16)
+        self.orientation_ids = orientation_ids[order].astype(np.int8)
+        self.num_tiles = num_tiles[order].astype(np.int8)
+        self.cells = cells[order]
+
+        # Invert cells into a cell -> placements index, skipping the padding
+        real = np.arange(5) < self.num_tiles[:, None]
+        covered_cells = self.cells[real]
+        covering_ids = np.nonzero(real)[0]
+        by_cell = np.lexsort((covering_ids, covered_cells))
+        self.cell_placements = covering_ids[by_cell].astype(np.int32)
+        self.cell_start = np.searchsorted(covered_cells[by_cell], np.arange(board_w * board_h + 1))
+
+        self._neighbourhoods = [None] * len(self)
+
+        self._moves = [None] * len(self)
+        self._ids = None
+        self._bit_masks = None
+        self._zobrist_keys = {}
+
+    @classmethod
+    def get(cls, piece_list, board_w, board_h):
+        """
+        Return the shared table for <piece_list> on a <board_w> x <board_h>
+        board, building it on first use.
+        """
+        key = (tuple(piece_list), board_w, board_h)
+        table = cls._cache.get(key)
+        if table is None:
+            table = cls._cache[key] = cls(piece_list, board_w, board_h)
+        return table
+
+    def covering(self, cells):
+        """
+        Return the sorted ids of all placements covering any of <cells>.
+        """
+        if len(cells) == 0:
+            return np.empty(0, np.int32)
+        return sorted_unique(np.concatenate(
+            [self.cell_placements[self.cell_start[c]:self.cell_start[c + 1]] for c in cells]))
+
+    def neighbourhood(self, placement_id):
+        """
+        Return the cells covered by placement <placement_id>, the cells
+        edge-adjacent to it and the cells only diagonally adjacent to it, as
+        three lists.
+        """
+        neighbourhood = self._neighbourhoods[placement_id]
+        if neighbourhood is None:
+            neighbourhood = self._neighbourhoods[placement_id] = self._find_neighbourhood(placement_id)
+        return neighbourhood
+
+    def _find_neighbourhood(self, placement_id):
+        w, h = self.board_w, self.board_h
+        tiles = set(self.cells[placement_id].tolist())
+        edges = set()
+        diagonals = set()
+        for c in tiles:
+            x, y = c % w, c // w
+            for (dx, dy) in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                if 0 <= x + dx < w and 0 <= y + dy < h:
+                    edges.add(c + dy * w + dx)
+            for (dx, dy) in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+                if 0 <= x + dx < w and 0 <= y + dy < h:
+                    diagonals.add(c + dy * w + dx)
+        edges -= tiles
+        diagonals -= tiles | edges
+        return list(tiles), list(edges), list(diagonals)
+
+    def zobrist_keys(self, num_players):
+        """
+        Return the ZobristKeys for <num_players> players on this table's
+        geometry, building them on first use.
+        """
+        keys = self._zobrist_keys.get(num_players)
+        if keys is None:
+            keys = self._zobrist_keys[num_players] = ZobristKeys(self, num_players)
+        return keys
+
+    def bit_masks(self):
+        """
+        Return the PlacementMasks used by BitBoard, building them on first use.
+        """
+        if self._bit_masks is None:
+            self._bit_masks = PlacementMasks(self)
+        return self._bit_masks
+
+    def get_move(self, placement_id):
+        """
+        Return the (shared) Move object for placement <placement_id>.
+        """
+        move = self._moves[placement_id]
+        if move is None:
+            piece_index = int(self.piece_ids[placement_id])
+            move = Move(self.pieces[piece_index],
+                        piece_index,
+                        self.orientations[piece_index][self.orientation_ids[placement_id]],
+                        int(self.xs[placement_id]),
+                        int(self.ys[placement_id]),
+                        placement_id=int(placement_id))
+            self._moves[placement_id] = move
+        return move
+
+    def find(self, move):
+        """
+        Return the id of the placement <move> describes, or None if the move
+        is out of bounds.
+        """
+        if move.placement_id is not None and self._moves[move.placement_id] is move:
+            return move.placement_id
+        if self._ids is None:
+            self._ids = {(int(self.piece_ids[i]),
+                          self.orientations[self.piece_ids[i]][self.orientation_ids[i]],
+                          int(self.xs[i]),
+                          int(self.ys[i])): i for i in range(len(self))}
+        return self._ids.get((move.piece_index, move.orientation, move.x, move.y))
+
+    def __len__(self):
+        return len(self.piece_ids)
+
+
+class PlacementMasks:
+    """
+    Python int bitmasks for every placement of a PlacementTable:
+    - tiles: the cells the placement covers
+    - edges: the in-bounds cells edge-adjacent to one of its tiles
+    - diagonals: the in-bounds cells diagonally adjacent to one of its tiles
+    """
+
+    def __init__(self, table):
+        w, h = table.board_w, table.board_h
+        cell_edges = []
+        cell_diagonals = []
+        for y in range(h):
+            for x in range(w):
+                edges = 0
+                diagonals = 0
+                for (dx, dy) in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                    if 0 <= x + dx < w and 0 <= y + dy < h:
+                        edges |= 1 << ((y + dy) * w + x + dx)
+                for (dx, dy) in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+                    if 0 <= x + dx < w and 0 <= y + dy < h:
+                        diagonals |= 1 << ((y + dy) * w + x + dx)
+                cell_edges.append(edges)
+                cell_diagonals.append(diagonals)
+
+        self.tiles = []
+        self.edges = []
+        self.diagonals = []
+        for cells in table.cells.tolist():
+            tiles = edges = diagonals = 0
+            for c in cells:
+                tiles |= 1 << c
+                edges |= cell_edges[c]
+                diagonals |= cell_diagonals[c]
+            self.tiles.append(tiles)
+            self.edges.append(edges)
+            self.diagonals.append(diagonals)
+
+
+class ZobristKeys:
+    """
+    Random keys for Zobrist hashing boards of a PlacementTable's geometry: a
+    board's hash is the XOR of the keys of every (player, cell) it has a tile
+    on and every (player, piece) that has been used, so add_move can update it
+    with one XOR per move (see move_key).
+
+    Keys are drawn from a fixed seed, so hashes are the same between runs and
+    processes.
+    """
+
+    seed = 67842
+
+    def __init__(self, table, num_players):
+        self.table = table
+        rng = np.random.default_rng(self.seed)
+        self.cells = rng.integers(0, 2 ** 62, (num_players, table.board_w * table.board_h)).tolist()
+        self.pieces = rng.integers(0, 2 ** 62, (num_players, len(table.pieces))).tolist()
+        self._move_keys = [{} for _ in range(num_players)]
+
+    def move_key(self, player, placement_id):
+        """
+        Return the key to XOR into a board's hash when <player> plays
+        placement <placement_id>.
+        """
+        key = self._move_keys[player].get(placement_id)
+        if key is None:
+            table = self.table
+            key = self.pieces[player][table.piece_ids[placement_id]]
+            for c in table.cells[placement_id, :table.num_tiles[placement_id]].tolist():
+                key ^= self.cells[player][c]
+            self._move_keys[player][placement_id] = key
+        return key
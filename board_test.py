@@ -0,0 +1,178 @@
+import random
+import unittest
+import numpy as np
+from board import Board, BitBoard, Move, PlacementTable
+from pieces import PieceList
+
+
+def brute_force_legal_moves(board, player):
+    """
+    Reference move generator: every piece at every cell in every orientation.
+    """
+    move_list = []
+    for piece_index, piece in enumerate(board.piece_list):
+        for x in range(board.board_w):
+            for y in range(board.board_h):
+                for ori in piece:
+                    new_move = Move(piece, piece_index, ori, x, y)
+                    if board.check_move_valid(player, new_move):
+                        move_list.append(new_move)
+    return move_list
+
+
+def move_key(move):
+    return move.piece_index, move.x, move.y, move.orientation
+
+
+def play_random_game(board, rng, max_moves=None):
+    """
+    Plays random legal moves for every player in turn, yielding the board
+    before each move.
+    """
+    played = 0
+    passed = [False] * board.num_players
+    while not all(passed) and (max_moves is None or played < max_moves):
+        for p in range(board.num_players):
+            if passed[p]:
+                continue
+            yield p
+            move_list = board.get_legal_moves(p)
+            if not move_list:
+                passed[p] = True
+                continue
+            board.add_move(p, rng.choice(move_list))
+            played += 1
+
+
+def four_player_board(w, h, piece_list):
+    board = Board(w, h, 4, piece_list)
+    board.connected[1, 0, w - 1] = True
+    board.connected[2, h - 1, 0] = True
+    board.connected[3, h - 1, w - 1] = True
+    return board
+
+
+class TestLegalMoves(unittest.TestCase):
+
+    def assert_same_moves(self, board, player):
+        expected = [move_key(m) for m in brute_force_legal_moves(board, player)]
+        actual = [move_key(m) for m in board.get_legal_moves(player)]
+        self.assertEqual(expected, actual)
+
+    def test_empty_board(self):
+        board = Board(7, 7, 1, PieceList('valid_pieces.txt'), (3, 2))
+        self.assert_same_moves(board, 0)
+
+    def test_random_single_player_game(self):
+        board = Board(6, 8, 1, PieceList('small_set.txt'))
+        for player in play_random_game(board, random.Random(0)):
+            self.assert_same_moves(board, player)
+
+    def test_random_four_player_game(self):
+        board = four_player_board(8, 8, PieceList('valid_pieces.txt'))
+        for player in play_random_game(board, random.Random(1)):
+            self.assert_same_moves(board, player)
+
+
+class TestBitBoard(unittest.TestCase):
+
+    def test_matches_board(self):
+        board = four_player_board(9, 8, PieceList('valid_pieces.txt'))
+        bit_board = BitBoard(9, 8, 4, PieceList('valid_pieces.txt'))
+        bit_board.corners[1] = 1 << 8
+        bit_board.corners[2] = 1 << (7 * 9)
+        bit_board.corners[3] = 1 << (8 * 9 - 1)
+        rng = random.Random(2)
+        for player in play_random_game(board, random.Random(2)):
+            expected = [move_key(m) for m in board.get_legal_moves(player)]
+            self.assertEqual(expected, [move_key(m) for m in bit_board.get_legal_moves(player)])
+            self.assertTrue(np.array_equal(board.state, bit_board.state))
+            self.assertTrue(np.array_equal(board._legal, bit_board._legal))
+            self.assertTrue(np.array_equal(board.connected, bit_board.connected))
+            if expected:
+                # replay the move play_random_game is about to make
+                move = rng.choice(board.get_legal_moves(player))
+                self.assertTrue(bit_board.check_move_valid(player, move))
+                bit_board = bit_board.do_move(player, move)
+        self.assertEqual(board.scores, bit_board.scores)
+
+
+class TestMakeUnmake(unittest.TestCase):
+
+    def assert_boards_equal(self, expected, actual):
+        self.assertTrue(np.array_equal(expected.state, actual.state))
+        self.assertTrue(np.array_equal(expected._legal, actual._legal))
+        self.assertTrue(np.array_equal(expected.connected, actual.connected))
+        self.assertTrue(np.array_equal(expected.pieces, actual.pieces))
+        self.assertEqual(expected.scores, actual.scores)
+
+    def check_push_pop(self, board_class):
+        board = board_class(8, 8, 1, PieceList('valid_pieces.txt'), (4, 4))
+        rng = random.Random(3)
+        snapshots = []
+        while board.get_legal_moves(0):
+            snapshots.append((board.__copy__(), [move_key(m) for m in board.get_legal_moves(0)]))
+            board.push_move(0, rng.choice(board.get_legal_moves(0)))
+        while snapshots:
+            board.pop_move()
+            expected, moves = snapshots.pop()
+            self.assert_boards_equal(expected, board)
+            self.assertEqual(moves, [move_key(m) for m in board.get_legal_moves(0)])
+
+    def test_push_pop_board(self):
+        self.check_push_pop(Board)
+
+    def test_push_pop_bit_board(self):
+        self.check_push_pop(BitBoard)
+
+    def test_lazy_successor(self):
+        board = Board(6, 6, 1, PieceList('small_set.txt'))
+        move = board.get_legal_moves(0)[3]
+        lazy = board.do_move_lazy(0, move)
+        self.assertIsNone(lazy._board)
+        self.assertEqual(lazy, board.do_move(0, move))
+        self.assert_boards_equal(board.do_move(0, move), lazy)
+        self.assertEqual(board.score(0), 0)
+
+
+class TestZobristHash(unittest.TestCase):
+
+    def check_transposition(self, board):
+        first, second = board.get_legal_moves(0)[0], board.get_legal_moves(1)[-1]
+        one_way = board.do_move(0, first).do_move(1, second)
+        other_way = board.do_move(1, second).do_move(0, first)
+        self.assertEqual(hash(one_way), hash(other_way))
+        self.assertEqual(one_way, other_way)
+        self.assertNotEqual(hash(one_way), hash(board.do_move(0, first)))
+        self.assertEqual(hash(board.do_move(0, first).do_move_lazy(1, second)), hash(one_way))
+
+    def test_board(self):
+        self.check_transposition(four_player_board(8, 8, PieceList('valid_pieces.txt')))
+
+    def test_bit_board(self):
+        board = BitBoard(8, 8, 2, PieceList('valid_pieces.txt'))
+        board.corners[1] = 1 << 63
+        self.check_transposition(board)
+
+
+class TestPlacementTable(unittest.TestCase):
+
+    def test_shared_between_boards(self):
+        first = Board(9, 7, 1, PieceList('small_set.txt'))
+        second = Board(9, 7, 4, PieceList('small_set.txt'))
+        self.assertIs(first.placements, second.placements)
+        self.assertIsNot(first.placements, Board(7, 9, 1, PieceList('small_set.txt')).placements)
+
+    def test_placements_match_moves(self):
+        table = PlacementTable.get(PieceList('valid_pieces.txt'), 6, 5)
+        for placement_id in range(len(table)):
+            move = table.get_move(placement_id)
+            cells = {(x + move.x, y + move.y) for (x, y) in move.orientation}
+            self.assertTrue(all(0 <= x < 6 and 0 <= y < 5 for (x, y) in cells))
+            self.assertEqual(cells, {(c % 6, c // 6) for c in table.cells[placement_id]})
+            self.assertEqual(table.find(Move(move.piece, move.piece_index, move.orientation, move.x, move.y)),
+                             placement_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
-import tkinter
 import sys
+import time
+import numpy as np
 
 """
 Classes to control the game's display (screen, GUI, etc)
+
+tkinter is only imported when a GuiDisplay is created, so that runs without
+a window never load Tk.
 """
 
 
@@ -17,22 +21,64 @@ class Display(object):
 
     display_error_string = "Error: using base display class"
 
-    def draw_board(self, board):
+    def draw_board(self, board, dots=()):
         """
-        Draw the board onto the screen, command line, etc
+        Draw the board onto the screen, command line, etc, marking the
+        (row, col) cells in <dots>
         """
         raise NotImplementedError(Display.display_error_string)
 
+    def flush(self):
+        """
+        Make sure the last board drawn is shown
+        """
+        pass
+
 
 class NoDisplay(Display):
     """The NoDisplay doesn't bother drawing the game. Useful for running many
     iterations of the game.
     """
 
-    def draw_board(self, board):
+    def draw_board(self, board, dots=()):
         pass
 
 
+class TextDisplay(Display):
+    """The TextDisplay prints the board to <stream>, one character per cell:
+    the number of the player owning it, '*' for a free dot or '.', with row 0
+    at the bottom like the GuiDisplay.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+
+    def draw_board(self, board, dots=()):
+        state = board.state
+        dots = {(int(row), int(col)) for (row, col) in dots}
+        lines = []
+        for row in range(len(state) - 1, -1, -1):
+            lines.append(''.join(str(state[row][col]) if state[row][col] != -1 else '*' if (row, col) in dots else '.'
+                                 for col in range(len(state[row]))))
+        self.stream.write('\n'.join(lines) + '\n\n')
+
+    def flush(self):
+        self.stream.flush()
+
+
+def make_display(kind, width, height, title=None):
+    """
+    Returns a display of the given <kind>: 'none', 'text' or 'gui'.
+    """
+    if kind == 'none':
+        return NoDisplay()
+    if kind == 'text':
+        return TextDisplay()
+    if kind == 'gui':
+        return GuiDisplay(width, height, title=title)
+    raise ValueError("Unknown display: %s" % kind)
+
+
 BLACK = '#%02x%02x%02x' % (int(0 * 255), int(0 * 255), int(0 * 255))
 GREY = '#%02x%02x%02x' % (int(0.8 * 255), int(0.8 * 255), int(0.8 * 255))
 RED = '#%02x%02x%02x' % (int(1 * 255), int(0 * 255), int(0 * 255))
@@ -42,20 +88,33 @@ BLUE = '#%02x%02x%02x' % (int(0 * 255), int(0 * 255), int(1 * 255))
 
 
 class GuiDisplay(Display):
+    """
+    A Tk window with one rectangle per cell, created once: draw_board only
+    recolors the cells that changed since the previous board (found with a
+    NumPy diff) and redraws the dots only when they change. The window is
+    refreshed at most <max_fps> times a second; flush() shows the last board
+    if it hasn't been shown yet.
+    """
+
     _width_cell = 20
     _line_width = 2
     _dot_width = 2
     _colors = [RED, YELLOW, GREEN, BLUE]
 
-    def __init__(self, x=20, y=20, color=GREY, title=None):
+    def __init__(self, x=20, y=20, color=GREY, title=None, max_fps=30):
         self.x = x
         self.y = y
+        self.max_fps = max_fps
+        self._last_update = 0
+        self._pending_update = False
+        self._dots = frozenset()
+        self._dot_items = []
         self._left_click_loc = None
         self._right_click_loc = None
         self._ctrl_left_click_loc = None
         self._keys_down = {}
         self._keys_waiting = {}
-        self.prev_state = None
+        self.prev_state = np.full((y, x), -1)
         # This holds an unprocessed key release.  We delay key releases by up to
         # one call to keys_pressed() to get round a problem with auto repeat.
         self._got_release = None
@@ -70,6 +129,7 @@ class GuiDisplay(Display):
         self.kill = False
 
         # Create the root window
+        import tkinter
         self._root_window = tkinter.Tk()
         self._root_window.protocol('WM_DELETE_WINDOW', self._destroy_window)
         self._root_window.title(title or 'Graphics Window')
@@ -84,6 +144,16 @@ class GuiDisplay(Display):
         # Bind to key-down and key-up events
         self._clear_keys()
 
+        # cells[i][j] is the rectangle of row i, column j (row 0 at the bottom)
+        self._cells = []
+        for i in range(y):
+            row = []
+            for j in range(x):
+                left, top = self._cell_corner(i, j)
+                right, bottom = left + GuiDisplay._width_cell - 1, top + GuiDisplay._width_cell - 1
+                row.append(self._canvas.create_rectangle(left, top, right, bottom, fill=color, outline=color))
+            self._cells.append(row)
+
         for i in range(x + 1):
             self.line((1 + GuiDisplay._line_width + i * (GuiDisplay._width_cell + GuiDisplay._line_width), 0),
                       (1 + GuiDisplay._line_width + i * (GuiDisplay._width_cell + GuiDisplay._line_width), height),
@@ -142,53 +212,55 @@ class GuiDisplay(Display):
         self._keys_waiting = {}
         self._got_release = None
 
-    def draw_board(self, board, dots=set()):
+    def _cell_corner(self, i, j):
+        """
+        Returns the canvas coordinates of the top left corner of the cell in
+        row i, column j.
+        """
+        i_ = self.y - i - 1
+        x = GuiDisplay._line_width + j * (GuiDisplay._line_width + GuiDisplay._width_cell) + 2
+        y = GuiDisplay._line_width + i_ * (GuiDisplay._line_width + GuiDisplay._width_cell) + 2
+        return x, y
+
+    def draw_board(self, board, dots=()):
         if self.kill:
             self._destroy_window()
 
-        state = board.state
-        y = len(state)
-        assert y == self.y
-        x_s = [len(r) for r in state]
-        x_max = max(x_s)
-        x_min = min(x_s)
-        assert x_max == x_min
-        assert x_max == self.x
-
-        for i in range(self.y):
-            for j in range(self.x):
-                if state[i][j] == -1:
-                    continue
-
-                if self.prev_state is not None and state[i][j] == self.prev_state[i][j]:
-                    continue
-
-                color = GuiDisplay._colors[state[i][j]]
-                i_ = self.y - i - 1
-                j_ = j
-                x = GuiDisplay._line_width + j_ * (GuiDisplay._line_width + GuiDisplay._width_cell) + 2
-                y = GuiDisplay._line_width + i_ * (GuiDisplay._line_width + GuiDisplay._width_cell) + 2
-                corners = [(x, y),
-                           (x + GuiDisplay._width_cell - 1, y),
-                           (x + GuiDisplay._width_cell - 1, y + GuiDisplay._width_cell - 1),
-                           (x, y + GuiDisplay._width_cell - 1)]
-
-                self.polygon(corners, color, fill_color=color, filled=True, smoothed=False)
+        state = np.asarray(board.state)
+        assert state.shape == (self.y, self.x)
+        for (i, j) in np.argwhere(state != self.prev_state).tolist():
+            color = self._bg_color if state[i, j] == -1 else GuiDisplay._colors[state[i, j]]
+            self._canvas.itemconfigure(self._cells[i][j], fill=color, outline=color)
         self.prev_state = state.copy()
 
-        for (i, j) in dots:
-            i_ = self.y - i - 1
-            j_ = j
-            x = GuiDisplay._line_width + j_ * (GuiDisplay._line_width + GuiDisplay._width_cell) + int(
-                GuiDisplay._width_cell / 2) - int(GuiDisplay._dot_width / 2) + 2
-            y = GuiDisplay._line_width + i_ * (GuiDisplay._line_width + GuiDisplay._width_cell) + int(
-                GuiDisplay._width_cell / 2) - int(GuiDisplay._dot_width / 2) + 2
+        dots = frozenset((int(i), int(j)) for (i, j) in dots)
+        if dots != self._dots:
+            self._draw_dots(dots)
 
+        self._pending_update = True
+        if time.time() - self._last_update >= 1.0 / self.max_fps:
+            self.flush()
+
+    def _draw_dots(self, dots):
+        for item in self._dot_items:
+            self._canvas.delete(item)
+        self._dot_items = []
+        offset = int(GuiDisplay._width_cell / 2) - int(GuiDisplay._dot_width / 2)
+        for (i, j) in dots:
+            x, y = self._cell_corner(i, j)
+            x, y = x + offset, y + offset
             corners = [(x, y),
                        (x + GuiDisplay._dot_width - 1, y),
                        (x + GuiDisplay._dot_width - 1, y + GuiDisplay._dot_width - 1),
                        (x, y + GuiDisplay._dot_width - 1)]
-            self.polygon(corners, BLACK, fill_color=BLACK, filled=True, smoothed=True)
+            self._dot_items.append(self.polygon(corners, BLACK, fill_color=BLACK, filled=True, smoothed=True))
+        self._dots = dots
+
+    def flush(self):
         if self.kill:
             self._destroy_window()
+        if not self._pending_update:
+            return
         self._canvas.update()
+        self._last_update = time.time()
+        self._pending_update = False
@@ -1,8 +1,17 @@
-from inputs import RandomInput
+from inputs import MCTSInput, RandomInput
 from pieces import PieceList
 from blokus_problems import *
-from search import astar
-from displays import GuiDisplay
+from board import BitBoard
+from search import astar, idastar, smastar, SearchStats, TranspositionTable
+from parallel import hdastar, portfolio_solve
+from functools import partial
+from displays import NoDisplay, make_display
+import numpy as np
+import multiprocessing
+import contextlib
+import random
+import json
+import time
 import sys
 import os
 import ast
@@ -14,8 +23,10 @@ class GameEngine(object):
     get input/draw output
     """
 
-    def __init__(self, inputs, width, height, piece_list):
-        self.display = GuiDisplay(width, height, title='Intro to AI -- 67842 -- Ex1')
+    def __init__(self, inputs, width, height, piece_list, display=None):
+        if display is None:
+            display = make_display('gui', width, height, title='Intro to AI -- 67842 -- Ex1')
+        self.display = display
         self.inputs = inputs
 
         self.piece_list = piece_list
@@ -79,20 +90,30 @@ class GameEngine(object):
         for p in range(self.num_players):
             print("Player %d: %d pts" % (p + 1, self.score[p]))
 
-    def play_game(self):
+    def play_game(self, print_scores=True):
         if len(self.inputs) != 4:
             print("Error: Need 4 players for a game. ")
             sys.exit(1)
         while not self.all_players_passed():
             self.play_turn()
+        self.display.flush()
 
-        self._print_scores()
+        if print_scores:
+            self._print_scores()
         return self.score
 
 
-def play_simple_search(problem, search_func):
+def play_simple_search(problem, search_func, display='gui', stats=None):
+    start = time.time()
     back_trace = search_func(problem)
-    display = GuiDisplay(problem.board.board_w, problem.board.board_h, title='Intro to AI -- 67842 -- Ex1')
+    search_time = time.time() - start
+    if back_trace is None:
+        print("No solution found. Expanded nodes: %d, search time: %.3fs" %
+              (problem.expanded, search_time))
+        if stats is not None:
+            print(stats)
+        return
+    display = make_display(display, problem.board.board_w, problem.board.board_h, title='Intro to AI -- 67842 -- Ex1')
     board = problem.get_start_state()
     if problem.__class__ == BlokusCornersProblem:
         dots = [(board.board_h - 1, board.board_w - 1), (0, board.board_w - 1), (board.board_h - 1, 0)]
@@ -104,12 +125,23 @@ def play_simple_search(problem, search_func):
     for action in back_trace:
         board.add_move(0, action)
         display.draw_board(board, dots=dots)
-    print("Expanded nodes: %d, score: %d" % (problem.expanded, board.score(0)))
-
-
-def play_a_star_search(problem, heuristic):
-    back_trace = astar(problem, heuristic)
-    display = GuiDisplay(problem.board.board_w, problem.board.board_h, title='Intro to AI -- 67842 -- Ex1')
+    display.flush()
+    print("Expanded nodes: %d, score: %d, search time: %.3fs" % (problem.expanded, board.score(0), search_time))
+    if stats is not None:
+        print(stats)
+
+
+def play_a_star_search(problem, heuristic, search_func=astar, display='gui', stats=None):
+    start = time.time()
+    back_trace = search_func(problem, heuristic)
+    search_time = time.time() - start
+    if back_trace is None:
+        print("No solution found (within the node budget, if any). Expanded nodes: %d, search time: %.3fs" %
+              (problem.expanded, search_time))
+        if stats is not None:
+            print(stats)
+        return
+    display = make_display(display, problem.board.board_w, problem.board.board_h, title='Intro to AI -- 67842 -- Ex1')
     board = problem.get_start_state()
 
     if problem.__class__ == BlokusCornersProblem:
@@ -123,17 +155,82 @@ def play_a_star_search(problem, heuristic):
     for action in back_trace:
         board.add_move(0, action)
         display.draw_board(board, dots=dots)
-    print("Expanded nodes: %d, score: %d" % (problem.expanded, board.score(0)))
+    display.flush()
+    print("Expanded nodes: %d, score: %d, search time: %.3fs" % (problem.expanded, board.score(0), search_time))
+    if stats is not None:
+        print(stats)
 
 
-def play_approximate_search(problem):
-    back_trace = problem.solve()
-    display = GuiDisplay(problem.board.board_w, problem.board.board_h, title='Intro to AI -- 67842 -- Ex1')
+def play_approximate_search(problem, solver=None, display='gui'):
+    start = time.time()
+    back_trace = problem.solve() if solver is None else solver(problem)
+    search_time = time.time() - start
+    display = make_display(display, problem.board.board_w, problem.board.board_h, title='Intro to AI -- 67842 -- Ex1')
     board = problem.get_start_state()
     for action in back_trace:
         board.add_move(0, action)
         display.draw_board(board, dots=problem.targets)
-    print("Expanded nodes: %d, score: %d" % (problem.expanded, board.score(0)))
+    display.flush()
+    print("Expanded nodes: %d, score: %d, search time: %.3fs" % (problem.expanded, board.score(0), search_time))
+
+
+_batch_piece_list = None
+
+
+def _init_batch_worker(pieces_file):
+    global _batch_piece_list
+    _batch_piece_list = PieceList(pieces_file)
+
+
+def play_headless_game(game_args):
+    """
+    Plays one game of a batch without a display, and returns its record.
+    """
+    game, seed, width, height, mcts_players, move_time = game_args
+    rng = random.Random(seed)
+    inputs = [MCTSInput(time_limit=move_time, seed=rng.getrandbits(32)) for _ in range(mcts_players)]
+    inputs += [RandomInput(random.Random(rng.getrandbits(32))) for _ in range(4 - mcts_players)]
+    engine = GameEngine(inputs, width, height, _batch_piece_list, display=NoDisplay())
+    start = time.time()
+    scores = engine.play_game(print_scores=False)
+    best = max(scores)
+    return {'game': game, 'seed': seed, 'scores': scores,
+            'winners': [p for p in range(len(scores)) if scores[p] == best],
+            'moves': int(np.count_nonzero(~engine.board.pieces)), 'seconds': time.time() - start}
+
+
+def play_batch(num_games, width, height, pieces_file, mcts_players=0, move_time=1.0, workers=None, output=None,
+               seed=0):
+    """
+    Plays <num_games> games without a display in a pool of <workers>
+    processes, writing each game's record as a JSON line to <output> (a file
+    name) as soon as it is over, then prints the score distribution of each
+    player and the number of games per second. Game i is seeded with
+    seed + i, so a batch can be replayed (time-limited MCTS players aside).
+
+    Returns the records, in game order.
+    """
+    start = time.time()
+    records = []
+    with open(output, 'w') if output is not None else contextlib.nullcontext() as out, \
+            multiprocessing.Pool(workers, initializer=_init_batch_worker, initargs=(pieces_file,)) as pool:
+        games = [(game, seed + game, width, height, mcts_players, move_time) for game in range(num_games)]
+        for record in pool.imap_unordered(play_headless_game, games):
+            records.append(record)
+            if out is not None:
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+    elapsed = time.time() - start
+
+    records.sort(key=lambda record: record['game'])
+    scores = np.array([record['scores'] for record in records])
+    print("%d games in %.2fs (%.2f games/s)" % (num_games, elapsed, num_games / elapsed))
+    for p in range(scores.shape[1]):
+        wins = sum(1.0 / len(record['winners']) for record in records if p in record['winners'])
+        print("Player %d: mean %.2f, std %.2f, min %d, median %.1f, max %d, wins %.1f%%" %
+              (p + 1, scores[:, p].mean(), scores[:, p].std(), scores[:, p].min(), np.median(scores[:, p]),
+               scores[:, p].max(), 100.0 * wins / num_games))
+    return records
 
 
 def load_heuristic(heuristic_name):
@@ -181,7 +278,7 @@ def main():
     parser.add_option('-f', '--search-function', dest='search_func',
                       metavar='FUNC', help='search function to use. This option is ignored for sub-optimal search. ',
                       type='choice',
-                      choices=['dfs', 'bfs', 'ucs', 'astar'], default='dfs')
+                      choices=['dfs', 'bfs', 'ucs', 'astar', 'idastar', 'smastar', 'hdastar', 'beam'], default='dfs')
     parser.add_option('-H', '--heuristic', dest='h_func',
                       help='heuristic function to use for A* search. \
                       This option is ignored for other search functions. ',
@@ -191,6 +288,35 @@ def main():
                       choices=['fill', 'diagonal', 'corners', 'cover', 'sub-optimal', 'mini-contest'], default=None)
     parser.add_option('-x', '--start-point', dest='start', type='int', nargs=2,
                       help='starting point', default=(0, 0))
+    parser.add_option('-b', '--board', dest='board', type='choice',
+                      help='board representation used by the puzzles', choices=['array', 'bitboard'],
+                      default='array')
+    parser.add_option('-t', '--transposition-table', dest='tt_size', type='int', metavar='SIZE',
+                      help='detect visited boards up to symmetry, remembering at most SIZE of them \
+                      (0 means no limit). This option is ignored for sub-optimal search. ', default=None)
+    parser.add_option('-n', '--node-budget', dest='node_budget', type='int', metavar='NODES',
+                      help='expansion budget for idastar, or number of nodes kept in memory by smastar', default=None)
+    parser.add_option('-j', '--workers', dest='workers', type='int', metavar='N',
+                      help='use N worker processes for hdastar and sub-optimal restarts. \
+                      This option is ignored for other searches. ', default=None)
+    parser.add_option('-w', '--beam-width', dest='beam_width', type='int', metavar='WIDTH',
+                      help='number of states kept at each depth by the beam search', default=10)
+    parser.add_option('-m', '--mcts-players', dest='mcts_players', type='int', metavar='N',
+                      help='number of players, from the first, using Monte Carlo tree search in a game', default=0)
+    parser.add_option('--move-time', dest='move_time', type='float', metavar='SECONDS',
+                      help='thinking time per move of the Monte Carlo tree search players', default=1.0)
+    parser.add_option('-d', '--display', dest='display', type='choice', choices=['none', 'text', 'gui'],
+                      help='how to show the game or the solution found: none, text or gui', default='gui')
+    parser.add_option('-g', '--games', dest='games', type='int', metavar='N',
+                      help='play N games without a display and report the score distribution', default=None)
+    parser.add_option('-o', '--output', dest='output', metavar='FILE',
+                      help='JSON lines file to write the records of the games played with --games to', default=None)
+    parser.add_option('--seed', dest='seed', type='int', help='seed of the first game played with --games',
+                      default=0)
+    parser.add_option('-r', '--restarts', dest='restarts', type='int', metavar='N',
+                      help='for sub-optimal search, keep the best of N randomized runs', default=None)
+    parser.add_option('-l', '--time-limit', dest='time_limit', type='float', metavar='SECONDS',
+                      help='wall-clock limit for the sub-optimal search restarts', default=None)
 
     options, cover_points = parser.parse_args()
     if (options.puzzle == 'cover' or options.puzzle == 'sub-optimal') and len(cover_points) == 0:
@@ -200,37 +326,76 @@ def main():
         targets = ast.literal_eval(''.join(cover_points))
 
     piece_list = PieceList(options.pieces_file)
-
-    if options.puzzle is None:
-        inputs = [RandomInput() for _ in range(4)]
-        engine = GameEngine(inputs, options.size[1], options.size[0], piece_list)
+    board_class = BitBoard if options.board == 'bitboard' else Board
+
+    if options.puzzle is None and options.games:
+        play_batch(options.games, options.size[1], options.size[0], options.pieces_file, options.mcts_players,
+                   options.move_time, options.workers, options.output, options.seed)
+        return False
+
+    elif options.puzzle is None:
+        inputs = [MCTSInput(time_limit=options.move_time) for _ in range(options.mcts_players)]
+        inputs += [RandomInput() for _ in range(4 - options.mcts_players)]
+        engine = GameEngine(inputs, options.size[1], options.size[0], piece_list,
+                            make_display(options.display, options.size[1], options.size[0],
+                                         title='Intro to AI -- 67842 -- Ex1'))
         engine.play_game()
 
     elif options.puzzle == 'sub-optimal':
-        problem = ClosestLocationSearch(options.size[1], options.size[0], piece_list, options.start, targets)
-        play_approximate_search(problem)
+        problem = ClosestLocationSearch(options.size[1], options.size[0], piece_list, options.start, targets,
+                                        board_class=board_class)
+        if options.restarts:
+            play_approximate_search(problem, partial(portfolio_solve, restarts=options.restarts,
+                                                     workers=options.workers, time_limit=options.time_limit),
+                                    options.display)
+        else:
+            play_approximate_search(problem, display=options.display)
 
     elif options.puzzle == 'mini-contest':
         problem = MiniContestSearch(options.size[1], options.size[0], piece_list, options.start, targets)
-        play_approximate_search(problem)
+        play_approximate_search(problem, display=options.display)
 
-    elif options.search_func in ['dfs', 'bfs', 'ucs', 'astar']:
+    elif options.search_func in ['dfs', 'bfs', 'ucs', 'astar', 'idastar', 'smastar', 'hdastar', 'beam']:
         if options.puzzle == 'fill':
-            problem = BlokusFillProblem(options.size[1], options.size[0], piece_list, options.start)
+            problem = BlokusFillProblem(options.size[1], options.size[0], piece_list, options.start,
+                                        board_class=board_class)
         elif options.puzzle == 'corners':
-            problem = BlokusCornersProblem(options.size[1], options.size[0], piece_list, options.start)
+            problem = BlokusCornersProblem(options.size[1], options.size[0], piece_list, options.start,
+                                           board_class=board_class)
         elif options.puzzle == 'cover':
-            problem = BlokusCoverProblem(options.size[1], options.size[0], piece_list, options.start, targets)
+            problem = BlokusCoverProblem(options.size[1], options.size[0], piece_list, options.start, targets,
+                                         board_class=board_class)
+
+        transposition_table = None
+        if options.tt_size is not None:
+            transposition_table = TranspositionTable(options.tt_size or None, key=problem.symmetries.canonical_key)
+        stats = SearchStats()
 
         if options.search_func in ['dfs', 'bfs', 'ucs']:
             search = __import__('search')
-            play_simple_search(problem, getattr(search, options.search_func))
+            play_simple_search(problem, partial(getattr(search, options.search_func),
+                                                transposition_table=transposition_table, stats=stats),
+                               options.display, stats)
         elif options.search_func == 'astar':
-            play_a_star_search(problem, load_heuristic(options.h_func))
+            play_a_star_search(problem, load_heuristic(options.h_func),
+                               partial(astar, transposition_table=transposition_table, stats=stats),
+                               options.display, stats)
+        elif options.search_func == 'idastar':
+            play_a_star_search(problem, load_heuristic(options.h_func),
+                               partial(idastar, max_expansions=options.node_budget), options.display)
+        elif options.search_func == 'smastar':
+            play_a_star_search(problem, load_heuristic(options.h_func),
+                               partial(smastar, max_nodes=options.node_budget or 100000), options.display)
+        elif options.search_func == 'beam':
+            play_approximate_search(BeamSearch(problem, options.beam_width), display=options.display)
+        elif options.search_func == 'hdastar':
+            play_a_star_search(problem, load_heuristic(options.h_func), partial(hdastar, workers=options.workers),
+                               options.display)
     else:
         raise Exception('unrecognized options')
+    return options.display == 'gui'
 
 
 if __name__ == "__main__":
-    main()
-    input("Press Enter to continue...")
+    if main():
+        input("Press Enter to continue...")
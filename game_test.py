@@ -0,0 +1,49 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from board import Board
+from displays import TextDisplay
+from game import play_batch
+from pieces import PieceList
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_records(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'games.jsonl')
+            records = play_batch(6, 8, 8, 'valid_pieces.txt', workers=2, output=output, seed=3)
+            with open(output) as lines:
+                streamed = sorted((json.loads(line) for line in lines), key=lambda record: record['game'])
+        self.assertEqual([record['scores'] for record in records], [record['scores'] for record in streamed])
+        self.assertEqual(list(range(6)), [record['game'] for record in records])
+        for record in records:
+            self.assertEqual(max(record['scores']), record['scores'][record['winners'][0]])
+
+    def test_seeded(self):
+        first = play_batch(3, 8, 8, 'valid_pieces.txt', workers=1, seed=11)
+        second = play_batch(3, 8, 8, 'valid_pieces.txt', workers=2, seed=11)
+        self.assertEqual([record['scores'] for record in first], [record['scores'] for record in second])
+
+
+class TestDisplays(unittest.TestCase):
+
+    def test_no_tk_without_gui(self):
+        code = "import sys, game; game.play_batch(1, 6, 6, 'valid_pieces.txt', workers=1); print('tkinter' in sys.modules)"
+        output = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', code], text=True)
+        self.assertEqual('False', output.split()[-1])
+
+    def test_text_display(self):
+        board = Board(3, 2, 1, PieceList('valid_pieces.txt'))
+        board.add_move(0, board.get_legal_moves(0)[0])
+        stream = io.StringIO()
+        TextDisplay(stream).draw_board(board, dots=[(1, 2), (0, 0)])
+        self.assertEqual('..*\n0..\n\n', stream.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,9 @@
+import math
+import random
+import time
+from board import legal_placements
+
+
 class Input(object):
     """
     The Input class defines an interface for the game engine to get input
@@ -28,14 +34,160 @@ class Input(object):
 
 class RandomInput(Input):
     """RandomInput players choose random moves (equally distributed over piece
-    number, x/y, and rotation/flip)
+    number, x/y, and rotation/flip), drawn from <rng> among the board's
+    incremental legal placements
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def get_move(self, player, board):
+        placements = legal_placements(board, player)
+        if len(placements) == 0:
+            return None
+        return board.placements.get_move(placements[self.rng.randrange(len(placements))])
+
+
+class SearchTreeNode(object):
+    """
+    A node of MCTSInput's search tree: the position after <move> (a placement
+    id, or None for a pass) was played from <parent>, with <player> to move.
+    passes counts the passes in a row leading here; the game is over when
+    every player has passed. rewards holds the sum of every player's rewards
+    over the playouts through the node.
     """
 
+    __slots__ = ('move', 'parent', 'player', 'passes', 'hash', 'children', 'untried', 'visits', 'rewards')
+
+    def __init__(self, move, parent, player, passes, board_hash, num_players):
+        self.move = move
+        self.parent = parent
+        self.player = player
+        self.passes = passes
+        self.hash = board_hash
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.rewards = [0.0] * num_players
+
+
+class MCTSInput(Input):
+    """
+    MCTSInput players pick their moves with Monte Carlo tree search (UCT).
+
+    Each move gets a budget of <time_limit> seconds and/or <playouts>
+    playouts (200 playouts if neither is given), and always at least one
+    playout, so that there is a move to pick. Playouts pick uniformly
+    random legal placements from the board's incremental legal move sets
+    instead of building move lists, and reward the players with the highest
+    score (a tie is shared). The tree is kept between turns: the next search
+    starts from the node matching the board it is given (by Zobrist hash)
+    if it is still in the tree.
+    """
+
+    def __init__(self, time_limit=None, playouts=None, exploration=math.sqrt(2), seed=None):
+        self.time_limit = time_limit
+        self.playouts = playouts if playouts is not None or time_limit is not None else 200
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+
     def get_move(self, player, board):
-        import random
+        board = board.__copy__()
+        if len(legal_placements(board, player)) == 0:
+            self.root = None
+            return None
+        self.root = self.find_root(player, board)
 
-        move_list = board.get_legal_moves(player)
-        if move_list:
-            return move_list[random.randint(0, len(move_list) - 1)]
-        # else
-        return None
+        start = time.time()
+        playouts = 0
+        while playouts == 0 or (self.playouts is None or playouts < self.playouts) and \
+                (self.time_limit is None or time.time() - start < self.time_limit):
+            self.playout(board)
+            playouts += 1
+
+        self.root = max(self.root.children, key=lambda child: child.visits)
+        return board.placements.get_move(self.root.move)
+
+    def find_root(self, player, board):
+        """
+        Returns the node of the previous search tree for <board> with <player>
+        to move, less than a round below the old root, or a new root.
+        """
+        nodes = [] if self.root is None else [self.root]
+        for _ in range(board.num_players + 1):
+            for node in nodes:
+                if node.hash == board._hash and node.player == player:
+                    node.parent = None
+                    return node
+            nodes = [child for node in nodes for child in node.children]
+        return SearchTreeNode(None, None, player, 0, board._hash, board.num_players)
+
+    def expand(self, node, board):
+        """
+        Lists the moves of <node> (whose position is <board>), or a pass.
+        """
+        node.untried = legal_placements(board, node.player).tolist() or [None]
+
+    def playout(self, board):
+        """
+        Runs one select/expand/simulate/back-up iteration from the root, on
+        <board> (the root's position, left unchanged).
+        """
+        num_players = board.num_players
+        node = self.root
+        pushed = 0
+        while node.passes < num_players:
+            if node.untried is None:
+                self.expand(node, board)
+            if node.untried:
+                move = node.untried.pop(self.rng.randrange(len(node.untried)))
+                if move is not None:
+                    board.push_move(node.player, board.placements.get_move(move))
+                    pushed += 1
+                child = SearchTreeNode(move, node, (node.player + 1) % num_players,
+                                       node.passes + 1 if move is None else 0, board._hash, num_players)
+                node.children.append(child)
+                node = child
+                break
+            node = self.select(node)
+            if node.move is not None:
+                board.push_move(node.parent.player, board.placements.get_move(node.move))
+                pushed += 1
+
+        rewards = self.simulate(board, node.player, node.passes)
+        for _ in range(pushed):
+            board.pop_move()
+        while node is not None:
+            node.visits += 1
+            for p in range(num_players):
+                node.rewards[p] += rewards[p]
+            node = node.parent
+
+    def select(self, node):
+        """
+        Returns the child of <node> with the highest UCT value for the player
+        to move at <node>.
+        """
+        log_visits = math.log(node.visits)
+        return max(node.children, key=lambda child: child.rewards[node.player] / child.visits +
+                   self.exploration * math.sqrt(log_visits / child.visits))
+
+    def simulate(self, board, player, passes):
+        """
+        Plays random moves on a copy of <board> from <player>'s turn until
+        every player passes, and returns each player's reward.
+        """
+        board = board.__copy__()
+        num_players = board.num_players
+        while passes < num_players:
+            placements = legal_placements(board, player)
+            if len(placements):
+                board.add_move(player, board.placements.get_move(placements[self.rng.randrange(len(placements))]))
+                passes = 0
+            else:
+                passes += 1
+            player = (player + 1) % num_players
+        best = max(board.scores)
+        winners = board.scores.count(best)
+        return [1.0 / winners if score == best else 0.0 for score in board.scores]
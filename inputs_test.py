@@ -0,0 +1,53 @@
+import random
+import unittest
+from board import Board
+from board_test import four_player_board
+from inputs import MCTSInput, RandomInput
+from pieces import PieceList
+
+
+def play_game(board, inputs):
+    """
+    GameEngine.play_game without a display: returns the final scores.
+    """
+    passed = [False] * len(inputs)
+    while not all(passed):
+        for p, player_input in enumerate(inputs):
+            if passed[p]:
+                continue
+            move = player_input.get_move(p, board)
+            if move is None:
+                passed[p] = True
+            else:
+                board.add_move(p, move)
+    return board.scores
+
+
+class TestMCTSInput(unittest.TestCase):
+
+    def test_legal_moves(self):
+        board = four_player_board(8, 8, PieceList('valid_pieces.txt'))
+        inputs = [MCTSInput(playouts=10, seed=5)] + [RandomInput(random.Random(k)) for k in range(3)]
+        play_game(board, inputs)
+        for p in range(4):
+            self.assertFalse(board.get_legal_moves(p))
+
+    def test_no_time(self):
+        board = four_player_board(8, 8, PieceList('valid_pieces.txt'))
+        move = MCTSInput(time_limit=0, seed=7).get_move(0, board)
+        self.assertTrue(board.check_move_valid(0, move))
+
+    def test_tree_reuse(self):
+        board = Board(6, 6, 2, PieceList('small_set.txt'))
+        board.connected[1, 5, 5] = True
+        mcts = MCTSInput(playouts=300, seed=6)
+        board.add_move(0, mcts.get_move(0, board))
+        # the opponent plays the reply the tree explored most
+        node = max(mcts.root.children, key=lambda child: child.visits)
+        board.add_move(1, board.placements.get_move(node.move))
+        self.assertGreater(node.visits, 0)
+        self.assertIs(node, mcts.find_root(0, board))
+        self.assertIsNone(node.parent)
+
+if __name__ == '__main__':
+    unittest.main()
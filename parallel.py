@@ -0,0 +1,205 @@
+"""
+Searching Blokus problems with several worker processes.
+"""
+
+import os
+import heapq
+import itertools
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from search import null_heuristic
+
+
+def replay(problem, path):
+    """
+    Returns the state reached by playing the placements in <path> (a tuple of
+    placement ids) from <problem>'s start state.
+    """
+    board = problem.get_start_state().__copy__()
+    table = board.placements
+    for placement_id in path:
+        board.add_move(0, table.get_move(placement_id))
+    return board
+
+
+def _hda_worker(problem, heuristic, index, inboxes, results, incumbent, idle, sent, received, expanded, done):
+    """
+    The search loop of one hash_distributed_a_star_search worker. Messages
+    are (g, path) pairs for the states this worker owns.
+    """
+    workers = len(inboxes)
+    inbox = inboxes[index]
+    fringe = []  # (f, count, g, path, state)
+    best = {}  # state -> lowest g seen
+    counter = itertools.count()
+    start_expanded = problem.expanded
+
+    def insert(state, g, path):
+        if best.get(state, float('inf')) <= g:
+            return
+        best[state] = g
+        heapq.heappush(fringe, (g + heuristic(state, problem=problem), next(counter), g, path, state))
+
+    while not done.value:
+        try:
+            g, path = inbox.get_nowait() if fringe else inbox.get(timeout=0.01)
+        except queue.Empty:
+            pass
+        else:
+            # busy before counting, so that the coordinator never sees this
+            # message as delivered while we still look idle
+            idle[index] = False
+            received[index] += 1
+            insert(replay(problem, path), g, path)
+            continue
+
+        if not fringe or fringe[0][0] >= incumbent.value:
+            # nothing here can beat the best goal found
+            idle[index] = True
+            continue
+        idle[index] = False
+        f, _, g, path, state = heapq.heappop(fringe)
+        if g > best[state]:
+            continue
+        if problem.is_goal_state(state):
+            with incumbent.get_lock():
+                if g < incumbent.value:
+                    incumbent.value = g
+                    results.put((g, path))
+            continue
+
+        for successor, action, cost in problem.get_successors(state):
+            owner = hash(successor) % workers
+            child_path = path + (action.placement_id,)
+            if owner == index:
+                insert(successor, g + cost, child_path)
+            else:
+                sent[index] += 1
+                inboxes[owner].put((g + cost, child_path))
+        expanded[index] = problem.expanded - start_expanded
+
+
+def hash_distributed_a_star_search(problem, heuristic=null_heuristic, workers=None, poll_interval=0.01):
+    """
+    HDA*: A* spread over <workers> processes, each owning the states whose
+    Zobrist hash is its index modulo <workers>, with its own open and closed
+    lists. Successors are sent to their owner as (g, placement ids from the
+    start) messages through multiprocessing queues, and rebuilt there.
+
+    A goal only becomes the incumbent solution; workers keep expanding nodes
+    whose f is below its cost. The search is over once every worker is idle
+    and every message sent has been received, as seen by two identical
+    consecutive snapshots of the workers' flags and message counters (a
+    single snapshot could read an idle flag just before a worker picks a
+    message up).
+
+    Works with the single player problems of blokus_problems.py (the actions
+    must be Moves from the board's PlacementTable). Returns the list of
+    actions to a cheapest goal, or None; problem.expanded is increased by
+    the number of nodes the workers expanded.
+    """
+    workers = workers or os.cpu_count()
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    incumbent = context.Value('d', float('inf'))
+    idle = context.Array('b', [True] * workers, lock=False)
+    # the last slot of sent counts the coordinator's message
+    sent = context.Array('q', workers + 1, lock=False)
+    received = context.Array('q', workers, lock=False)
+    expanded = context.Array('q', workers, lock=False)
+    done = context.Value('b', False, lock=False)
+
+    processes = [context.Process(target=_hda_worker, daemon=True,
+                                 args=(problem, heuristic, index, inboxes, results, incumbent, idle, sent, received,
+                                       expanded, done))
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    sent[workers] = 1
+    inboxes[hash(problem.get_start_state()) % workers].put((0, ()))
+
+    previous = None
+    while True:
+        time.sleep(poll_interval)
+        if any(process.exitcode not in (None, 0) for process in processes):
+            done.value = True
+            raise RuntimeError("A search worker failed")
+        snapshot = (list(idle), list(sent), list(received), incumbent.value)
+        if all(snapshot[0]) and sum(snapshot[1]) == sum(snapshot[2]) and snapshot == previous:
+            break
+        previous = snapshot
+
+    cost = incumbent.value
+    path = None
+    while path is None and cost < float('inf'):
+        g, goal_path = results.get()
+        if g == cost:
+            path = goal_path
+    done.value = True
+    for process in processes:
+        while process.is_alive():
+            # keep the queues empty, so that no worker blocks on exit
+            try:
+                results.get(timeout=poll_interval)
+            except queue.Empty:
+                pass
+        process.join()
+    problem.expanded += sum(expanded)
+
+    if path is None:
+        return None
+    table = problem.get_start_state().placements
+    return [table.get_move(placement_id) for placement_id in path]
+
+
+_problem = None
+
+
+def _init_portfolio(problem):
+    global _problem
+    _problem = problem
+
+
+def _solve_restart(seed, deadline):
+    """
+    One portfolio_solve run: returns (uncovered targets, tiles, placement
+    ids, expanded nodes).
+    """
+    problem = _problem
+    problem.random.seed(seed)
+    expanded = problem.expanded
+    backtrace = problem.solve(deadline)
+    path = tuple(move.placement_id for move in backtrace)
+    return (problem.objective_function(replay(problem, path)), sum(move.piece.get_num_tiles() for move in backtrace),
+            path, problem.expanded - expanded)
+
+
+def portfolio_solve(problem, restarts, workers=None, time_limit=None, seed=0):
+    """
+    Runs <restarts> copies of the randomized problem.solve() (e.g. of a
+    blokus_problems.ClosestLocationSearch), seeded seed, seed + 1, ..., in a
+    pool of <workers> processes, and returns the best backtrace: the one
+    leaving the fewest targets uncovered, then using the fewest tiles (the
+    first seed wins ties).
+
+    With a <time_limit> in seconds, running restarts return what they have
+    when it expires and restarts that haven't started return nothing.
+    problem.expanded is increased by the nodes all restarts expanded.
+    """
+    deadline = None if time_limit is None else time.time() + time_limit
+    workers = min(workers or os.cpu_count(), restarts)
+    with ProcessPoolExecutor(workers, initializer=_init_portfolio, initargs=(problem,)) as pool:
+        results = list(pool.map(_solve_restart, range(seed, seed + restarts), itertools.repeat(deadline)))
+
+    problem.expanded += sum(result[3] for result in results)
+    best = min(results, key=lambda result: result[:2])
+    table = problem.get_start_state().placements
+    return [table.get_move(placement_id) for placement_id in best[2]]
+
+
+# Abbreviations
+hdastar = hash_distributed_a_star_search
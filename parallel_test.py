@@ -0,0 +1,57 @@
+import unittest
+from blokus_problems import BlokusCornersProblem, BlokusCoverProblem, ClosestLocationSearch
+from blokus_problems import blokus_corners_heuristic, blokus_cover_heuristic
+from parallel import hash_distributed_a_star_search, portfolio_solve
+from pieces import PieceList
+from search import a_star_search
+
+
+class TestHashDistributedAStar(unittest.TestCase):
+
+    def check_same_cost(self, make_problem, heuristic):
+        problem = make_problem()
+        expected = problem.get_cost_of_actions(a_star_search(problem, heuristic))
+        problem = make_problem()
+        actions = hash_distributed_a_star_search(problem, heuristic, workers=3)
+        self.assertEqual(expected, problem.get_cost_of_actions(actions))
+        self.assertGreater(problem.expanded, 0)
+        board = problem.get_start_state().__copy__()
+        for action in actions:
+            board.add_move(0, action)
+        self.assertTrue(problem.is_goal_state(board))
+
+    def test_cover(self):
+        self.check_same_cost(lambda: BlokusCoverProblem(5, 5, PieceList('small_set.txt'), targets=[(4, 2), (2, 4)]),
+                             blokus_cover_heuristic)
+
+    def test_corners(self):
+        self.check_same_cost(lambda: BlokusCornersProblem(4, 4, PieceList('small_set.txt')), blokus_corners_heuristic)
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def make_problem(self, seed=None):
+        return ClosestLocationSearch(6, 6, PieceList('valid_pieces.txt'), targets=[(0, 3), (3, 0), (4, 4)], seed=seed)
+
+    def test_best_restart(self):
+        runs = []
+        for seed in range(5, 9):
+            problem = self.make_problem(seed)
+            actions = problem.solve()
+            board = problem.get_start_state().__copy__()
+            for action in actions:
+                board.add_move(0, action)
+            runs.append((problem.objective_function(board), board.score(0), [a.placement_id for a in actions]))
+        problem = self.make_problem()
+        actions = portfolio_solve(problem, 4, workers=2, seed=5)
+        best = min(runs, key=lambda run: run[:2])
+        self.assertEqual(best[2], [action.placement_id for action in actions])
+        self.assertEqual(0, best[0])
+        self.assertGreater(problem.expanded, 0)
+
+    def test_time_limit(self):
+        self.assertEqual([], portfolio_solve(self.make_problem(), 2, workers=1, time_limit=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
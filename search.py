@@ -3,8 +3,11 @@ In search.py, you will implement generic search algorithms
 """
 
 import util
-from collections import deque
-from queue import PriorityQueue as PQ
+import heapq
+import itertools
+import time
+from collections import deque, OrderedDict
+from functools import partial
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -27,8 +30,10 @@ class Node:
     def __init__(self, state, parent=None, spawned_action=None):
         self.children = []
         self.parent = parent
+        self.depth = 0
         if self.parent:
             self.parent.add_child(self)
+            self.depth = self.parent.depth + 1
         self.state = state
         self.spawned_action = spawned_action
     @classmethod
@@ -81,6 +86,65 @@ class HeuristicNode(PrioritizedNode):
             problem=problem
         )
 
+
+class CostNode(Node):
+    """
+    A Node that keeps the cost g of the path leading to it apart from its
+    priority (g plus the heuristic estimate of the node's own state).
+    """
+
+    def __init__(self, state, parent=None, spawned_action=None, g=0, priority=0):
+        super().__init__(state, parent=parent, spawned_action=spawned_action)
+        self.g = g
+        self.priority = priority
+
+
+class SlimNode:
+    """
+    A search node that only links to its parent: nodes don't know their
+    children, so an expanded node is freed as soon as no node below it is
+    left in the fringe. priority is g plus the heuristic estimate of the
+    node's own state.
+    """
+
+    __slots__ = ('state', 'parent', 'spawned_action', 'g', 'priority', 'depth')
+
+    def __init__(self, state, parent=None, spawned_action=None, g=0, priority=0):
+        self.state = state
+        self.parent = parent
+        self.spawned_action = spawned_action
+        self.g = g
+        self.priority = priority
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    @classmethod
+    def root(cls, problem):
+        return cls(problem.get_start_state())
+
+    @classmethod
+    def from_successor(cls, successor, parent, heuristic=null_heuristic, problem=None):
+        state, action, cost = successor
+        g = parent.g + cost
+        return cls(state, parent=parent, spawned_action=action, g=g, priority=g + heuristic(state, problem=problem))
+
+
+class MemoryBoundedNode(CostNode):
+    """
+    A CostNode for simplified_memory_bounded_a_star_search: children holds the
+    children currently in memory, forgotten maps the index (in the parent's
+    get_successors list) of each child dropped to make room to its backed up
+    priority, index is the node's own index in its parent's successors, and
+    version is bumped whenever the node's entries in the search's heaps
+    become stale.
+    """
+
+    def __init__(self, state, parent=None, spawned_action=None, g=0, priority=0, index=None):
+        super().__init__(state, parent=parent, spawned_action=spawned_action, g=g, priority=priority)
+        self.index = index
+        self.forgotten = {}
+        self.version = 0
+
+
 class Fringe:
     
     def add(self, element):
@@ -113,6 +177,9 @@ class Stack(Fringe):
     def __bool__(self):
         return len(self.deque) != 0
 
+    def __len__(self):
+        return len(self.deque)
+
 
 class Queue(Fringe):
 
@@ -128,18 +195,98 @@ class Queue(Fringe):
     def __bool__(self):
         return len(self.deque) != 0
 
+    def __len__(self):
+        return len(self.deque)
+
 class PriorityQueue(Fringe):
-    def __init__(self):
-        self.queue = PQ()
+    """
+    A binary heap of nodes, lowest priority first. Nodes with equal priority
+    come out according to tie_breaking:
+    - 'fifo': the oldest first
+    - 'lifo': the newest first
+    - 'deeper': the deepest first, then the oldest (the default)
+
+    The Blokus problems have many nodes of equal f, and preferring the
+    deepest ones reaches a goal with fewer expansions: e.g. A* on the 6x6
+    cover problem with targets [(5, 5), (0, 5)] and small_set.txt expands
+    5758 nodes with 'deeper', 7360 with 'lifo' and 8687 with 'fifo'.
+    """
+
+    def __init__(self, tie_breaking='deeper'):
+        if tie_breaking == 'fifo':
+            self.tie_breaker = lambda node, count: count
+        elif tie_breaking == 'lifo':
+            self.tie_breaker = lambda node, count: -count
+        elif tie_breaking == 'deeper':
+            self.tie_breaker = lambda node, count: (-node.depth, count)
+        else:
+            raise ValueError("Unknown tie breaking policy: %s" % tie_breaking)
+        self.heap = []
+        self.counter = itertools.count()
 
     def add(self, element):
-        self.queue.put(element)
+        heapq.heappush(self.heap, (element.priority, self.tie_breaker(element, next(self.counter)), element))
 
     def retrieve(self):
-        return self.queue.get()
+        return heapq.heappop(self.heap)[-1]
 
     def __bool__(self):
-        return not self.queue.empty()
+        return len(self.heap) != 0
+
+    def __len__(self):
+        return len(self.heap)
+
+class TranspositionTable:
+    """
+    A bounded replacement for the visited set of generic_search (or the
+    state -> value map of graph_a_star_search).
+
+    States are stored under key(state), so states that key() maps to the same
+    value (e.g. boards that are mirror images of each other, when the problem
+    is symmetric) count as visited once. When more than max_size keys are
+    stored, the least recently used one is forgotten.
+    """
+
+    def __init__(self, max_size=None, key=None):
+        self.max_size = max_size
+        self.key = key if key is not None else (lambda state: state)
+        self.table = OrderedDict()
+        self._last = (None, None)
+
+    def _key(self, state):
+        # generic_search looks a state up and then adds it, so remember the
+        # last key computed
+        if self._last[0] is not state:
+            self._last = (state, self.key(state))
+        return self._last[1]
+
+    def add(self, state):
+        self[state] = True
+
+    def get(self, state, default=None):
+        key = self._key(state)
+        if key in self.table:
+            self.table.move_to_end(key)
+            return self.table[key]
+        return default
+
+    def __setitem__(self, state, value):
+        key = self._key(state)
+        self.table[key] = value
+        self.table.move_to_end(key)
+        if self.max_size is not None and len(self.table) > self.max_size:
+            self.table.popitem(last=False)
+
+    def __contains__(self, state):
+        key = self._key(state)
+        if key in self.table:
+            self.table.move_to_end(key)
+            return True
+        return False
+
+    def __len__(self):
+        return len(self.table)
+
 
 class SearchProblem:
     """
@@ -185,6 +332,61 @@ class SearchProblem:
         util.raiseNotDefined()
 
 
+class SearchStats:
+    """
+    What a search did, filled in by generic_search and graph_a_star_search:
+    - generated: successors returned by get_successors
+    - expanded: states whose successors were generated
+    - duplicates: nodes pruned because their state was already expanded or
+      reached more cheaply
+    - peak_fringe: the largest fringe size seen after an expansion (left at
+      0 by generic_search if its fringe class has no __len__)
+    - successor_time, heuristic_time, search_time: seconds spent in
+      get_successors, in the heuristic and in the whole
+      search
+    Passing the same object to several searches adds up their numbers.
+    """
+
+    def __init__(self):
+        self.generated = 0
+        self.expanded = 0
+        self.duplicates = 0
+        self.peak_fringe = 0
+        self.successor_time = 0.0
+        self.heuristic_time = 0.0
+        self.search_time = 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.expanded / self.search_time if self.search_time else 0.0
+
+    def timed(self, heuristic):
+        """
+        Returns <heuristic>, adding the time spent in it to heuristic_time.
+        """
+        if heuristic is null_heuristic:
+            return heuristic
+
+        def timed_heuristic(state, problem=None):
+            start = time.perf_counter()
+            value = heuristic(state, problem=problem)
+            self.heuristic_time += time.perf_counter() - start
+            return value
+        return timed_heuristic
+
+    def as_dict(self):
+        return {'generated': self.generated, 'expanded': self.expanded, 'duplicates': self.duplicates,
+                'peak_fringe': self.peak_fringe, 'successor_time': self.successor_time,
+                'heuristic_time': self.heuristic_time, 'search_time': self.search_time,
+                'nodes_per_second': self.nodes_per_second}
+
+    def __str__(self):
+        return ("Generated: %d, expanded: %d, duplicates pruned: %d, peak fringe: %d, successor time: %.3fs, "
+                "heuristic time: %.3fs, %.0f nodes/s" % (self.generated, self.expanded, self.duplicates,
+                                                        self.peak_fringe, self.successor_time,
+                                                        self.heuristic_time, self.nodes_per_second))
+
+
 def restore_actions(goal_node):
     reverse_actions = []
     current = goal_node
@@ -195,24 +397,320 @@ def restore_actions(goal_node):
     return reverse_actions[::-1]
 
 
-def generic_search(problem, fringe_class, node_class=Node, heuristic=null_heuristic):
+def restore_actions_from_parents(parents, goal_node):
+    """
+    Like restore_actions, for a goal node whose ancestors were unlinked after
+    being expanded: parents maps every expanded state to
+    (its parent's state, the action leading from it), or None for the start.
+    """
+    reverse_actions = [goal_node.spawned_action] if goal_node.parent is not None else []
+    link = parents[goal_node.parent.state] if goal_node.parent is not None else None
+    while link is not None:
+        state, action = link
+        reverse_actions.append(action)
+        link = parents[state]
+    return reverse_actions[::-1]
+
+
+def generic_search(problem, fringe_class, node_class=SlimNode, heuristic=null_heuristic, transposition_table=None,
+                   parent_map=False, stats=None, on_expand=None):
+    """
+    Graph search expanding nodes in the order fringe_class hands them out.
+
+    With <parent_map>, every expanded node is unlinked from its own parent and
+    the link is kept as a state -> (parent state, action) entry instead, so
+    at most two levels of nodes stay alive; the path to the goal is rebuilt
+    from the map.
+
+    The counters and timers of the search are added to <stats> (a
+    SearchStats), and on_expand(node, successors, stats) is called after
+    every expansion.
+    """
+    get_successors = problem.get_successors
+    stats = SearchStats() if stats is None else stats
+    heuristic = stats.timed(heuristic)
+    clock = time.perf_counter
+    search_start = clock()
     fringe = fringe_class()
     fringe.add(node_class.root(problem))
-    visited = set()
-    while fringe:
-        current = fringe.retrieve()
-
-        if problem.is_goal_state(current.state):
-            return restore_actions(current)
-        if current.state not in visited:
-            for successor in problem.get_successors(current.state):
+    sized = hasattr(fringe, '__len__')
+    visited = set() if transposition_table is None else transposition_table
+    parents = {}
+    try:
+        while fringe:
+            current = fringe.retrieve()
+
+            if problem.is_goal_state(current.state):
+                if parent_map:
+                    return restore_actions_from_parents(parents, current)
+                return restore_actions(current)
+            if current.state in visited:
+                stats.duplicates += 1
+                continue
+            if parent_map:
+                # keep the first link, a state evicted from a transposition
+                # table may be expanded again from one of its descendants
+                if current.state not in parents:
+                    parents[current.state] = None if current.parent is None else \
+                        (current.parent.state, current.spawned_action)
+                current.parent = None
+            start = clock()
+            successors = get_successors(current.state)
+            stats.successor_time += clock() - start
+            for successor in successors:
                 fringe.add(node_class.from_successor(successor, current, heuristic=heuristic, problem=problem))
 
             visited.add(current.state)
-    return None
+            stats.expanded += 1
+            stats.generated += len(successors)
+            if sized:
+                stats.peak_fringe = max(stats.peak_fringe, len(fringe))
+            if on_expand is not None:
+                on_expand(current, successors, stats)
+        return None
+    finally:
+        stats.search_time += clock() - search_start
+
+
+def graph_a_star_search(problem, heuristic=null_heuristic, reopen=False, tie_breaking='deeper', table=None,
+                        stats=None, on_expand=None):
+    """
+    A* that remembers the cheapest known path cost g of every state it has
+    seen, in <table> (a dict by default, or e.g. a TranspositionTable):
+    - a successor is only pushed if it improves on the known g of its state,
+      so dominated duplicates never reach the fringe (or the heuristic)
+    - a cheaper path to a state in the fringe is pushed as a new node and the
+      old one is skipped when it is popped (lazy decrease-key)
+    - a cheaper path to an already expanded state is dropped, unless <reopen>
+      is set, which keeps A* optimal with inconsistent heuristics
+
+    Lazy successors (see board.LazyBoard) save nothing here, only in dfs,
+    bfs and ucs: the heuristic reads every successor pushed, which builds
+    its board, and a duplicate is built too when it is compared with the
+    state of the same hash in <table>.
+
+    Returns the list of actions to the goal, like generic_search, which
+    <stats> and <on_expand> are also passed on to (the dominated successors
+    dropped count as duplicates).
+    """
+    get_successors = problem.get_successors
+    stats = SearchStats() if stats is None else stats
+    heuristic = stats.timed(heuristic)
+    clock = time.perf_counter
+    search_start = clock()
+    fringe = PriorityQueue(tie_breaking)
+    table = {} if table is None else table  # state -> (best g, expanded)
+    start = problem.get_start_state()
+    table[start] = (0, False)
+    fringe.add(SlimNode(start, priority=heuristic(start, problem=problem)))
+    try:
+        while fringe:
+            current = fringe.retrieve()
+            best = table.get(current.state)
+            if best is not None and (best[1] or current.g > best[0]):
+                stats.duplicates += 1
+                continue
+
+            if problem.is_goal_state(current.state):
+                return restore_actions(current)
+            table[current.state] = (current.g, True)
+            start = clock()
+            successors = get_successors(current.state)
+            stats.successor_time += clock() - start
+            for successor, action, cost in successors:
+                g = current.g + cost
+                best = table.get(successor)
+                if best is not None and (g >= best[0] or (best[1] and not reopen)):
+                    stats.duplicates += 1
+                    continue
+                table[successor] = (g, False)
+                fringe.add(SlimNode(successor, parent=current, spawned_action=action, g=g,
+                                    priority=g + heuristic(successor, problem=problem)))
+
+            stats.expanded += 1
+            stats.generated += len(successors)
+            stats.peak_fringe = max(stats.peak_fringe, len(fringe))
+            if on_expand is not None:
+                on_expand(current, successors, stats)
+        return None
+    finally:
+        stats.search_time += clock() - search_start
+
+
+def iterative_deepening_a_star_search(problem, heuristic=null_heuristic, max_expansions=None):
+    """
+    IDA*: repeated depth-first searches that cut off paths whose f = g + h
+    exceeds a bound, starting from h(start) and raising the bound to the
+    smallest f that was cut off. Only the current path (and its siblings) is
+    kept in memory.
 
+    Returns the list of actions to a cheapest goal, or None if there is none
+    or if more than <max_expansions> nodes had to be expanded.
+    """
+    found, exhausted = 'found', 'exhausted'
+    actions = []
+    expansions = [0]
+
+    def bounded_search(state, g, f, bound):
+        if f > bound:
+            return f
+        if problem.is_goal_state(state):
+            return found
+        if max_expansions is not None and expansions[0] >= max_expansions:
+            return exhausted
+        expansions[0] += 1
+
+        smallest_cut = float('inf')
+        for successor, action, cost in problem.get_successors(state):
+            # f never decreases along a path (pathmax)
+            successor_f = max(f, g + cost + heuristic(successor, problem=problem))
+            actions.append(action)
+            result = bounded_search(successor, g + cost, successor_f, bound)
+            if result is found or result is exhausted:
+                return result
+            actions.pop()
+            smallest_cut = min(smallest_cut, result)
+        return smallest_cut
+
+    start = problem.get_start_state()
+    bound = heuristic(start, problem=problem)
+    while True:
+        result = bounded_search(start, 0, bound, bound)
+        if result is found:
+            return actions
+        if result is exhausted or result == float('inf'):
+            return None
+        bound = result
+
+
+def simplified_memory_bounded_a_star_search(problem, heuristic=null_heuristic, max_nodes=100000):
+    """
+    SMA*: A* that never keeps more than about <max_nodes> nodes in memory.
+
+    When the search tree grows past max_nodes, the leaf with the highest f
+    (the shallowest one among equals) is dropped and its f is remembered by
+    its parent, whose own f is backed up to the lowest f of its children,
+    dropped or not. A parent with dropped children stays open at the f of
+    the best of them, and regenerates that child alone when selected; a
+    parent that lost all of its children becomes a leaf again, and gives
+    them their remembered f when it is expanded again. Nodes are
+    expanded all at once, so memory can exceed max_nodes by one node's
+    successors while the worst of them are being dropped.
+
+    Returns the list of actions to a cheapest goal reachable within the
+    memory limit, or None.
+    """
+    inf = float('inf')
+    best = []  # (f, -depth, count, version, node): lowest f, deepest first
+    worst = []  # (-f, depth, count, version, node): highest f, shallowest first
+    counter = itertools.count()
 
-def depth_first_search(problem):
+    def push(node):
+        """
+        Replaces the heap entries of <node>: a leaf goes on both heaps, a
+        node with children only on best, at its best dropped child's f.
+        """
+        node.version += 1
+        count = next(counter)
+        if not node.children:
+            heapq.heappush(best, (node.priority, -node.depth, count, node.version, node))
+            heapq.heappush(worst, (-node.priority, node.depth, count, node.version, node))
+        elif node.forgotten:
+            heapq.heappush(best, (min(node.forgotten.values()), -node.depth, count, node.version, node))
+
+    def pop(heap):
+        while heap:
+            node = heap[0][-1]
+            if heap[0][-2] == node.version:
+                return node
+            heapq.heappop(heap)
+        return None
+
+    def back_up(node):
+        while node is not None and node.children:
+            priority = min(min(child.priority for child in node.children), min(node.forgotten.values(), default=inf))
+            if priority == node.priority:
+                break
+            node.priority = priority
+            node = node.parent
+
+    def forget(leaf):
+        leaf.version += 1
+        parent = leaf.parent
+        parent.children.remove(leaf)
+        parent.forgotten[leaf.index] = leaf.priority
+        if not parent.children:
+            # the parent is a leaf again; its children get their remembered
+            # f back when it is expanded again
+            parent.priority = min(parent.forgotten.values())
+        push(parent)
+        back_up(parent if parent.children else parent.parent)
+
+    root = MemoryBoundedNode(problem.get_start_state())
+    root.priority = heuristic(root.state, problem=problem)
+    push(root)
+    in_memory = 1
+    while True:
+        current = pop(best)
+        if current is None or best[0][0] == inf:
+            return None
+
+        if current.children:
+            # bring back the best child dropped earlier, with its backed up f
+            index = min(current.forgotten, key=current.forgotten.get)
+            successor, action, cost = problem.get_successors(current.state)[index]
+            keep = MemoryBoundedNode(successor, parent=current, spawned_action=action, g=current.g + cost,
+                                     priority=current.forgotten.pop(index), index=index)
+            push(keep)
+            push(current)
+            in_memory += 1
+        else:
+            if problem.is_goal_state(current.state):
+                return restore_actions(current)
+
+            successors = problem.get_successors(current.state)
+            if not successors or current.depth + 1 >= max_nodes:
+                # a dead end, or a path that can't grow any longer
+                current.priority = inf
+                if current.parent is None:
+                    return None
+                forget(current)
+                in_memory -= 1
+                continue
+
+            for index, (successor, action, cost) in enumerate(successors):
+                g = current.g + cost
+                priority = current.forgotten.get(index)
+                if priority is None:
+                    priority = max(current.priority, g + heuristic(successor, problem=problem))
+                MemoryBoundedNode(successor, parent=current, spawned_action=action, g=g, index=index,
+                                  priority=priority)
+            current.forgotten = {}
+            for child in current.children:
+                push(child)
+            push(current)
+            in_memory += len(successors)
+            keep = min(current.children, key=lambda child: child.priority)
+            back_up(current)
+
+        # never drop the node just generated that the search goes on with,
+        # or it could be regenerated and dropped forever
+        kept = False
+        while in_memory > max_nodes:
+            leaf = pop(worst)
+            if leaf is keep:
+                heapq.heappop(worst)
+                kept = True
+                continue
+            if leaf is None or leaf.parent is None:
+                break
+            forget(leaf)
+            in_memory -= 1
+        if kept:
+            push(keep)
+
+
+def depth_first_search(problem, transposition_table=None, stats=None, on_expand=None):
     """
     Search the deepest nodes in the search tree first.
 
@@ -226,28 +724,31 @@ def depth_first_search(problem):
     print("Is the start a goal?", problem.is_goal_state(problem.get_start_state()))
     print("Start's successors:", problem.get_successors(problem.get_start_state()))
     """
-    return generic_search(problem, Stack)
+    return generic_search(problem, Stack, transposition_table=transposition_table, stats=stats, on_expand=on_expand)
 
 
-def breadth_first_search(problem):
+def breadth_first_search(problem, transposition_table=None, stats=None, on_expand=None):
     """
     Search the shallowest nodes in the search tree first.
     """
-    return generic_search(problem, Queue)
+    return generic_search(problem, Queue, transposition_table=transposition_table, stats=stats, on_expand=on_expand)
 
 
-def uniform_cost_search(problem):
+def uniform_cost_search(problem, transposition_table=None, tie_breaking='deeper', stats=None, on_expand=None):
     """
     Search the node of least total cost first.
     """
-    return generic_search(problem, PriorityQueue, node_class=PrioritizedNode)
+    return generic_search(problem, partial(PriorityQueue, tie_breaking=tie_breaking),
+                          transposition_table=transposition_table, stats=stats, on_expand=on_expand)
 
 
-def a_star_search(problem, heuristic=null_heuristic):
+def a_star_search(problem, heuristic=null_heuristic, transposition_table=None, tie_breaking='deeper', reopen=False,
+                  stats=None, on_expand=None):
     """
     Search the node that has the lowest combined cost and heuristic first.
     """
-    return generic_search(problem, PriorityQueue, node_class=HeuristicNode, heuristic=heuristic)
+    return graph_a_star_search(problem, heuristic, reopen=reopen, tie_breaking=tie_breaking,
+                               table=transposition_table, stats=stats, on_expand=on_expand)
 
 
 # Abbreviations
@@ -255,3 +756,5 @@ bfs = breadth_first_search
 dfs = depth_first_search
 astar = a_star_search
 ucs = uniform_cost_search
+idastar = iterative_deepening_a_star_search
+smastar = simplified_memory_bounded_a_star_search
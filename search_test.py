@@ -0,0 +1,228 @@
+import unittest
+from blokus_problems import BlokusCornersProblem, BlokusCoverProblem, BlokusFillProblem, blokus_cover_heuristic
+from pieces import PieceList
+from search import Fringe, PriorityQueue, PrioritizedNode, Queue, SearchProblem, SearchStats, SlimNode, Stack
+from search import TranspositionTable
+from search import a_star_search, breadth_first_search, generic_search, uniform_cost_search
+from search import iterative_deepening_a_star_search, simplified_memory_bounded_a_star_search
+
+
+class GraphProblem(SearchProblem):
+    """
+    S -> A -> B -> G is the cheapest path (5), but with the inconsistent
+    heuristic below A* reaches B through S -> B (3) first.
+    """
+
+    edges = {'S': [('A', 1), ('B', 3)], 'A': [('B', 1)], 'B': [('G', 3)], 'G': []}
+    estimates = {'S': 0, 'A': 3, 'B': 0, 'G': 0}
+
+    def get_start_state(self):
+        return 'S'
+
+    def is_goal_state(self, state):
+        return state == 'G'
+
+    def get_successors(self, state):
+        return [(target, state + target, cost) for (target, cost) in self.edges[state]]
+
+    def get_cost_of_actions(self, actions):
+        return sum(dict(self.edges[action[0]])[action[1]] for action in actions)
+
+
+def graph_heuristic(state, problem=None):
+    return GraphProblem.estimates[state]
+
+
+class TreeProblem(GraphProblem):
+    """
+    R -> B -> G2 (4) is the cheapest path; the cheap looking branch through A
+    needs more nodes than a tight memory budget allows.
+    """
+
+    edges = {'R': [('A', 1), ('B', 3)], 'A': [('A1', 1)], 'A1': [('A2', 1)], 'A2': [('G1', 10)], 'B': [('G2', 1)],
+             'G1': [], 'G2': []}
+
+    def get_start_state(self):
+        return 'R'
+
+    def is_goal_state(self, state):
+        return state.startswith('G')
+
+    def get_successors(self, state):
+        return [(target, target, cost) for (target, cost) in self.edges[state]]
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        table = TranspositionTable(max_size=2)
+        table.add(1)
+        table.add(2)
+        self.assertIn(1, table)
+        table.add(3)
+        self.assertIn(1, table)
+        self.assertNotIn(2, table)
+        self.assertEqual(len(table), 2)
+
+    def test_mirrored_boards_share_key(self):
+        problem = BlokusFillProblem(6, 6, PieceList('small_set.txt'))
+        key = problem.symmetries.canonical_key
+        start = problem.get_start_state()
+        keys = {key(start.do_move(0, move)) for move in start.get_legal_moves(0) if move.piece_index == 3}
+        # the L-tromino fits the corner in 3 ways, two of them mirror images
+        self.assertEqual(len(keys), 2)
+
+    def test_same_cost_as_plain_search(self):
+        problem = BlokusCornersProblem(4, 4, PieceList('small_set.txt'))
+        expected = problem.get_cost_of_actions(breadth_first_search(problem))
+        plain_expanded = problem.expanded
+
+        problem = BlokusCornersProblem(4, 4, PieceList('small_set.txt'))
+        table = TranspositionTable(key=problem.symmetries.canonical_key)
+        self.assertEqual(expected, problem.get_cost_of_actions(breadth_first_search(problem, table)))
+        self.assertLess(problem.expanded, plain_expanded)
+
+
+class TestAStar(unittest.TestCase):
+
+    def test_reopening(self):
+        problem = GraphProblem()
+        self.assertEqual(6, problem.get_cost_of_actions(a_star_search(problem, graph_heuristic)))
+        self.assertEqual(['SA', 'AB', 'BG'], a_star_search(problem, graph_heuristic, reopen=True))
+
+    def test_same_cost_as_ucs(self):
+        problem = BlokusCoverProblem(5, 5, PieceList('small_set.txt'), targets=[(4, 2), (2, 4)])
+        expected = problem.get_cost_of_actions(uniform_cost_search(problem))
+        problem = BlokusCoverProblem(5, 5, PieceList('small_set.txt'), targets=[(4, 2), (2, 4)])
+        self.assertEqual(expected, problem.get_cost_of_actions(a_star_search(problem, blokus_cover_heuristic)))
+
+
+class TestMemoryBoundedSearch(unittest.TestCase):
+
+    def make_problem(self):
+        return BlokusCoverProblem(5, 5, PieceList('small_set.txt'), targets=[(4, 2), (2, 4)])
+
+    def test_ida_star(self):
+        self.assertEqual(['SA', 'AB', 'BG'], iterative_deepening_a_star_search(GraphProblem(), graph_heuristic))
+        problem = self.make_problem()
+        expected = problem.get_cost_of_actions(uniform_cost_search(problem))
+        problem = self.make_problem()
+        actions = iterative_deepening_a_star_search(problem, blokus_cover_heuristic)
+        self.assertEqual(expected, problem.get_cost_of_actions(actions))
+        self.assertIsNone(iterative_deepening_a_star_search(self.make_problem(), max_expansions=3))
+
+    def test_sma_star(self):
+        self.assertEqual(['SA', 'AB', 'BG'],
+                         simplified_memory_bounded_a_star_search(GraphProblem(), graph_heuristic, max_nodes=4))
+        problem = self.make_problem()
+        expected = problem.get_cost_of_actions(uniform_cost_search(problem))
+        problem = self.make_problem()
+        actions = simplified_memory_bounded_a_star_search(problem, blokus_cover_heuristic, max_nodes=200)
+        self.assertEqual(expected, problem.get_cost_of_actions(actions))
+
+    def test_sma_star_tight_budget(self):
+        self.assertIsNone(simplified_memory_bounded_a_star_search(TreeProblem(), max_nodes=2))
+        for max_nodes in range(3, 7):
+            self.assertEqual(['B', 'G2'], simplified_memory_bounded_a_star_search(TreeProblem(), max_nodes=max_nodes))
+        problem = self.make_problem()
+        expected = problem.get_cost_of_actions(uniform_cost_search(problem))
+        problem = self.make_problem()
+        # far fewer nodes than A* keeps, so subtrees get dropped and regenerated
+        actions = simplified_memory_bounded_a_star_search(problem, blokus_cover_heuristic, max_nodes=40)
+        self.assertEqual(expected, problem.get_cost_of_actions(actions))
+
+
+class TestParentMap(unittest.TestCase):
+
+    def test_slim_node_has_no_dict(self):
+        self.assertFalse(hasattr(SlimNode('root'), '__dict__'))
+
+    def test_same_path(self):
+        for fringe_class in [Stack, Queue, PriorityQueue]:
+            expected = generic_search(BlokusCornersProblem(4, 4, PieceList('small_set.txt')), fringe_class)
+            actual = generic_search(BlokusCornersProblem(4, 4, PieceList('small_set.txt')), fringe_class,
+                                    parent_map=True)
+            self.assertEqual([move.placement_id for move in expected], [move.placement_id for move in actual])
+        self.assertEqual(['SA', 'AB', 'BG'], generic_search(GraphProblem(), PriorityQueue, parent_map=True))
+
+
+class TestSearchStats(unittest.TestCase):
+
+    def test_generic_search(self):
+        problem = BlokusCornersProblem(4, 4, PieceList('small_set.txt'))
+        stats = SearchStats()
+        expansions = []
+        breadth_first_search(problem, stats=stats, on_expand=lambda node, successors, _: expansions.append(successors))
+        self.assertEqual(stats.expanded, problem.expanded)
+        self.assertEqual(stats.expanded, len(expansions))
+        self.assertEqual(stats.generated, sum(len(successors) for successors in expansions))
+        self.assertGreater(stats.duplicates, 0)
+        self.assertGreater(stats.peak_fringe, 0)
+        self.assertLessEqual(stats.successor_time, stats.search_time)
+        self.assertEqual(stats.heuristic_time, 0)
+
+    def test_fringe_without_len(self):
+        class ListFringe(Fringe):
+            def __init__(self):
+                self.nodes = []
+
+            def add(self, element):
+                self.nodes.append(element)
+
+            def retrieve(self):
+                return self.nodes.pop()
+
+            def __bool__(self):
+                return bool(self.nodes)
+
+        stats = SearchStats()
+        self.assertEqual(['SB', 'BG'], generic_search(GraphProblem(), ListFringe, stats=stats))
+        self.assertEqual((2, 0), (stats.expanded, stats.peak_fringe))
+
+    def test_a_star(self):
+        stats = SearchStats()
+        expanded = []
+        a_star_search(GraphProblem(), graph_heuristic, stats=stats,
+                      on_expand=lambda node, successors, _: expanded.append(node.state))
+        self.assertEqual(['S', 'B', 'A'], expanded)
+        # A -> B is dropped, B being already expanded
+        self.assertEqual((4, 3, 1), (stats.generated, stats.expanded, stats.duplicates))
+        self.assertEqual(2, stats.peak_fringe)
+
+        problem = BlokusCoverProblem(5, 5, PieceList('small_set.txt'), targets=[(4, 2), (2, 4)])
+        stats = SearchStats()
+        a_star_search(problem, blokus_cover_heuristic, stats=stats)
+        self.assertEqual(stats.expanded, problem.expanded)
+        self.assertGreater(stats.heuristic_time, 0)
+        self.assertGreater(stats.nodes_per_second, 0)
+
+
+class TestPriorityQueue(unittest.TestCase):
+
+    def drain(self, fringe):
+        order = []
+        while fringe:
+            order.append(fringe.retrieve().state)
+        return order
+
+    def fill(self, tie_breaking):
+        fringe = PriorityQueue(tie_breaking)
+        root = PrioritizedNode('root', priority=1)
+        fringe.add(PrioritizedNode('a', priority=2))
+        fringe.add(root)
+        fringe.add(PrioritizedNode('b', parent=root, priority=1))
+        fringe.add(PrioritizedNode('c', priority=2))
+        return fringe
+
+    def test_fifo(self):
+        self.assertEqual(['root', 'a', 'b', 'c'], self.drain(self.fill('fifo')))
+
+    def test_lifo(self):
+        self.assertEqual(['root', 'c', 'b', 'a'], self.drain(self.fill('lifo')))
+
+    def test_deeper(self):
+        self.assertEqual(['root', 'b', 'a', 'c'], self.drain(self.fill('deeper')))
+
+
+if __name__ == '__main__':
+    unittest.main()